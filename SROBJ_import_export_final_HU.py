@@ -1,7 +1,8 @@
 import bpy
 import os
-import bmesh
-import mathutils # mathutils importálva
+import re
+import numpy as np
+from itertools import chain
 from bpy.props import StringProperty, PointerProperty, BoolProperty
 from bpy.types import Operator, Panel, PropertyGroup
 from bpy_extras.io_utils import ImportHelper, ExportHelper
@@ -22,68 +23,71 @@ def name_exists(name):
     """Ellenőrzi, hogy létezik-e már ilyen nevű objektum a Blenderben."""
     return name in bpy.data.objects
 
-# --- Import Funkció (bmesh alapú, textúra hozzárendeléssel) ---
+# --- SROBJ feldolgozás (NumPy alapú) ---
+
+# Sor-minták bájt szinten; az 'f' sorból csak az első 3 sarok 'v' és 'vt' indexe kell
+SROBJ_V_RE = re.compile(rb'^[ \t]*v[ \t]+(\S+)[ \t]+(\S+)[ \t]+(\S+)', re.M)
+SROBJ_VT_RE = re.compile(rb'^[ \t]*vt[ \t]+(\S+)[ \t]+(\S+)', re.M)
+SROBJ_F_RE = re.compile(rb'^[ \t]*f' + rb'[ \t]+(-?\d+)(?:/(-?\d*))?\S*' * 3, re.M)
+SROBJ_PREFIX_RE = {key: re.compile(rb'^[ \t]*' + key + rb'\b', re.M) for key in (b'v', b'vt', b'f')}
+
+# Export sor-sablonok (bájt): soronként egyetlen %-formázás, átmeneti listák és str objektumok nélkül
+SROBJ_VG_TPL = b'vg %d/%d\n'
+SROBJ_V_TPL = b'v %.6f %.6f %.6f\n'
+SROBJ_VN_TPL = b'vn %.6f %.6f %.6f\n'
+SROBJ_VT_TPL = b'vt %.6f %.6f\n'
+SROBJ_F_TPL = b'f %d/%d/%d %d/%d/%d %d/%d/%d\n' # v/vt/vn sarkonként, 1-alapú indexekkel
+SROBJ_F_NOUV_TPL = b'f %d//%d %d//%d %d//%d\n' # v//vn, ha a mesh-nek nincs UV rétege
+
+def parse_srobj(filepath, flip_uv_v=False):
+    """
+    SROBJ fájl beolvasása NumPy tömbökbe, opcionális UV V-flip-pel.
+    Visszatérés: verts (N,3) float32 Blender tengelyekkel, uvs (M,2) float32, faces (F,3,2) int32 (v_idx, uv_idx).
+    """
+    # Egyetlen nyers olvasás, pufferelés és dekódolás nélkül; a feldolgozás bájtokon történik
+    with open(filepath, 'rb', buffering=0) as f:
+        data = f.readall()
+
+    # Első menet: sor-prefixek megszámolása, ebből pontos méretű tömbök foglalhatók
+    nv, nvt, nf = (len(SROBJ_PREFIX_RE[key].findall(data)) for key in (b'v', b'vt', b'f'))
+
+    # Második menet: a találatok mezői közvetlenül az előre lefoglalt tömbökbe kerülnek (nincs soronkénti tuple lista).
+    # Ha egy sor hiányos, a minta nem illeszkedik rá, így a mezők száma kevesebb lesz a vártnál.
+    def fill(pattern, count, dtype, key):
+        fields = chain.from_iterable(m.groups() for m in pattern.finditer(data))
+        try:
+            return np.fromiter((x or b'0' for x in fields), dtype=dtype, count=count)
+        except ValueError:
+            raise ValueError(f"Hibás '{key}' sor formátum a fájlban.")
+
+    # Silkroad (X, Z, Y) -> Blender (X, -Y, Z), egyben az egész tömbön
+    verts = fill(SROBJ_V_RE, nv * 3, np.float32, 'v').reshape(nv, 3)[:, [0, 2, 1]]
+    verts[:, 1] *= -1.0
+
+    uvs = fill(SROBJ_VT_RE, nvt * 2, np.float32, 'vt').reshape(nvt, 2)
+    if flip_uv_v:
+        # Egyszeri tömbművelet a shader-ben futó Mapping node helyett
+        uvs[:, 1] = 1.0 - uvs[:, 1]
+
+    # Sarkonként (v, vt) párok; hiányzó UV index esetén -1
+    faces = fill(SROBJ_F_RE, nf * 6, np.int32, 'f').reshape(nf, 3, 2)
+    faces -= 1
+
+    return verts, uvs, faces
+
+# --- Import Funkció (from_pydata alapú, textúra hozzárendeléssel) ---
 
 def import_srobj_advanced(filepath, texturepath, flip_uv_v=False):
     """
-    Silkroad OBJ (.srobj) fájl importálása bmesh segítségével,
+    Silkroad OBJ (.srobj) fájl importálása tömeges mesh építéssel,
     textúra hozzárendeléssel és opcionális UV V-flip-pel.
     """
-    verts = []
-    uv_coords_from_file = []
-    faces_data = []
-
     try:
-        with open(filepath, 'r', encoding='utf-8') as f: # Hozzáadva az encoding='utf-8' a robusztusabb fájlolvasáshoz
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith("#"):
-                    continue
-                parts = line.split()
-                if not parts: # Üres sorok ellenőrzése split után
-                    continue
-
-                if parts[0] == "o":
-                    # Az 'o' sor után az objektum nevét olvassuk, de az srobj formátumban ez nem mindig használt
-                    # A kód később a fájlnévből generálja az objektum nevet, ami rendben van.
-                    # Ha szükség van a fájlban lévő 'o' név használatára:
-                    # obj_name_from_file = parts[1] if len(parts) > 1 else "unnamed_object"
-                    pass # Jelenleg nem használjuk fel, de a jövőre nézve jó tudni
-                elif parts[0] == "v":
-                    # Silkroad (X, Z, Y) -> Blender (X, -Y, Z)
-                    # Ez a konverzió specifikus a Silkroad-hoz, és rendben van, ha ez a helyes.
-                    if len(parts) < 4: raise ValueError(f"Hibás 'v' sor formátum: {line}")
-                    x, z, y = map(float, parts[1:4])
-                    verts.append((x, -y, z))
-                elif parts[0] == "vt":
-                    if len(parts) < 3: raise ValueError(f"Hibás 'vt' sor formátum: {line}")
-                    u, v = map(float, parts[1:3])
-                    uv_coords_from_file.append((u, v))
-                elif parts[0] == "f":
-                    if len(parts) < 4: raise ValueError(f"Hibás 'f' sor formátum: {line}. A face-eknek legalább 3 vertex-re van szükségük.")
-                    face_verts_uvs = []
-                    # Csak az első 3 vertex-et vesszük (háromszögek)
-                    # További ellenőrzés, hogy a string nem üres-e, mielőtt int-é konvertáljuk
-                    for part in parts[1:4]:
-                        indices = part.split('/')
-                        if not indices[0]: raise ValueError(f"Üres vertex index az 'f' sorban: {line}")
-                        v_idx = int(indices[0]) - 1
-                        
-                        uv_idx = -1
-                        if len(indices) > 1 and indices[1]: # Ellenőrizzük, hogy van-e UV index, és nem üres-e
-                            uv_idx = int(indices[1]) - 1
-                        
-                        face_verts_uvs.append((v_idx, uv_idx))
-                    
-                    if len(face_verts_uvs) == 3:
-                        faces_data.append(tuple(face_verts_uvs))
-                    else:
-                        print(f"Figyelem: Nem háromszög alakú face található az SROBJ fájlban, kihagyva: {line}")
-
+        verts, uv_coords_from_file, faces_data = parse_srobj(filepath, flip_uv_v)
     except Exception as e:
         raise Exception(f"Hiba az SROBJ fájl olvasása közben '{filepath}': {e}")
 
-    # Mesh és Objektum létrehozása bmesh segítségével
+    # Mesh és Objektum létrehozása
     base_name = os.path.basename(filepath).split('.')[0]
     final_obj_name = base_name
     idx = 0
@@ -95,63 +99,37 @@ def import_srobj_advanced(filepath, texturepath, flip_uv_v=False):
     obj = bpy.data.objects.new(final_obj_name, mesh)
     bpy.context.collection.objects.link(obj)
     bpy.context.view_layer.objects.active = obj
-    bpy.context.view_layer.update() # Fontos lehet az objektum hozzáadásakor
-
-    bm = bmesh.new()
-    # A vertexek közvetlen hozzáadása a bmesh-hez, majd a mesh-hez írás.
-    # Eredeti: bm.from_mesh(mesh) - erre nincs szükség, ha üres mesh-ből indulunk
-    
-    bm_verts = [bm.verts.new(v) for v in verts]
-    bm.verts.ensure_lookup_table()
 
-    # Fontos: A UV réteg létrehozása azután, hogy a bm.from_mesh(mesh) vagy bm.verts.new() hívások befejeződtek,
-    # és a bmesh már tartalmazza a vertexeket.
-    uv_layer = bm.loops.layers.uv.new("UVMap")
-
-    # Face-ek és UV-k hozzárendelése
-    for face_info in faces_data:
-        try:
-            # Győződjünk meg róla, hogy a vertex indexek érvényesek
-            bm_face_verts = []
-            for v_idx, _ in face_info:
-                if v_idx < 0 or v_idx >= len(bm_verts):
-                    raise IndexError(f"Érvénytelen vertex index ({v_idx}) a face-ben: {face_info}")
-                bm_face_verts.append(bm_verts[v_idx])
-            
-            # Ellenőrizzük, hogy a face nem-kétszeres vertexeket tartalmaz-e
-            if len(set(bm_face_verts)) != 3:
-                print(f"Figyelem: Duplikált vertexek a face-ben {face_info}. Kihagyva.")
-                continue
-
-            bm_face = bm.faces.new(tuple(bm_face_verts))
-            bm_face.normal_update() # Frissítjük a normalt a face létrehozása után
-            
-            for loop, (v_idx, uv_idx) in zip(bm_face.loops, face_info):
-                if uv_idx != -1 and uv_idx < len(uv_coords_from_file):
-                    uv_coord = uv_coords_from_file[uv_idx]
-                    # Az UV V-flip-et itt is alkalmazhatjuk a bmesh szinten, ha szükséges
-                    # Jelenleg a material node-ban van, ami általában jobb, mert módosítható
-                    loop[uv_layer].uv = uv_coord
-                else:
-                    print(f"Figyelem: Érvénytelen UV index {uv_idx} a {v_idx} vertexhez a {face_info} face-ben. Az UV nem került beállításra.")
-        except ValueError as e:
-            print(f"Figyelem: Nem sikerült létrehozni a face-t a {face_info} adatokkal - {e}. Kihagyva.")
-        except IndexError as e:
-            print(f"Hiba: Érvénytelen vertex vagy UV index a face-ben {face_info}: {e}. Kihagyva.")
-        except Exception as e:
-            print(f"Váratlan hiba történt a face {face_info} feldolgozása közben: {e}. Kihagyva.")
-
-    # A bmesh-ben lévő geometry ellenőrzése (opcionális, nagy fájloknál lassú lehet)
-    # try:
-    #     bm.verts.ensure_lookup_table()
-    #     bm.edges.ensure_lookup_table()
-    #     bm.faces.ensure_lookup_table()
-    # except Exception as e:
-    #     print(f"Figyelem: Hiba a bmesh lookup táblák frissítésekor: {e}")
-
-    bm.to_mesh(mesh)
-    mesh.update()
-    bm.free()
+    # Érvénytelen vertex indexű vagy duplikált vertexű (degenerált) face-ek kiszűrése egyben, a mesh építése előtt
+    face_verts = faces_data[:, :, 0]
+    valid = ((face_verts >= 0) & (face_verts < len(verts))).all(axis=1)
+    valid &= (face_verts[:, 0] != face_verts[:, 1]) & (face_verts[:, 1] != face_verts[:, 2]) & (face_verts[:, 0] != face_verts[:, 2])
+    if not valid.all():
+        print(f"Figyelem: {int((~valid).sum())} face érvénytelen vagy duplikált vertex indexekkel. Kihagyva.")
+        faces_data = faces_data[valid]
+
+    # A teljes geometria nyers bufferekből, foreach_set-tel jön létre: a from_pydata elemenként járná be a NumPy tömböket
+    num_tris = len(faces_data)
+    mesh.vertices.add(len(verts))
+    mesh.vertices.foreach_set("co", np.ascontiguousarray(verts, dtype=np.float32).ravel())
+    mesh.loops.add(num_tris * 3)
+    mesh.loops.foreach_set("vertex_index", faces_data[:, :, 0].astype(np.int32).ravel())
+    mesh.polygons.add(num_tris)
+    mesh.polygons.foreach_set("loop_start", np.arange(0, num_tris * 3, 3, dtype=np.int32))
+
+    # UV-k loop sorrendben: a face-ek sarkai sorban kerülnek a loopokba, így az uv indexek közvetlenül kiolvashatók
+    uv_layer = mesh.uv_layers.new(name="UVMap")
+    uv_idx = faces_data[:, :, 1].ravel()
+    uv_ok = (uv_idx >= 0) & (uv_idx < len(uv_coords_from_file))
+    if not uv_ok.all():
+        print(f"Figyelem: {int((~uv_ok).sum())} loop érvénytelen UV indexszel. Ezek UV-ja nem került beállításra.")
+    loop_uvs = np.zeros((len(uv_idx), 2), dtype=np.float32)
+    loop_uvs[uv_ok] = uv_coords_from_file[uv_idx[uv_ok]]
+    uv_layer.data.foreach_set("uv", loop_uvs.ravel())
+
+    # Duplikált face-ek eltávolítása, majd az élek felépítése; a normálokat a Blender lustán számolja
+    mesh.validate(verbose=False)
+    mesh.update(calc_edges=True)
 
     # --- Textúra és Material hozzárendelés ---
     if texturepath and os.path.exists(texturepath):
@@ -176,7 +154,11 @@ def import_srobj_advanced(filepath, texturepath, flip_uv_v=False):
             image_texture = nodes.new(type='ShaderNodeTexImage')
             # Ellenőrizzük, hogy az image betöltése sikeres-e
             try:
-                image_texture.image = bpy.data.images.load(texturepath)
+                # Már betöltött kép újrahasznosítása (ismételt / több objektumos importnál nem jön létre új Image)
+                img = bpy.data.images.get(os.path.basename(texturepath))
+                if img is None or bpy.path.abspath(img.filepath) != bpy.path.abspath(texturepath):
+                    img = bpy.data.images.load(texturepath, check_existing=True)
+                image_texture.image = img
             except RuntimeError as e: # Specifikusabb hibakezelés képbetöltéshez
                 print(f"Hiba a textúra betöltésekor '{texturepath}': {e}. Kérjük, ellenőrizze a fájlformátumot és a Blender DDS támogatását.")
                 # Nem dobunk itt kivételt, hogy a material legalább létrejöjjön textúra nélkül
@@ -189,15 +171,8 @@ def import_srobj_advanced(filepath, texturepath, flip_uv_v=False):
             uv_map_node.location = (-600, 100)
             uv_map_node.uv_map = "UVMap" # Biztosítjuk, hogy a megfelelő UV Map-et használja
 
-            mapping = nodes.new(type='ShaderNodeMapping')
-            mapping.location = (-200, 0)
-            
-            if flip_uv_v:
-                mapping.inputs['Scale'].default_value[1] = -1
-            
-            # Linkek módosítása az UV Map node bevonásával
-            links.new(uv_map_node.outputs['UV'], mapping.inputs['Vector'])
-            links.new(mapping.outputs['Vector'], image_texture.inputs['Vector'])
+            # A V-flip már az UV adatokban van, így Mapping node nélkül közvetlenül köthető
+            links.new(uv_map_node.outputs['UV'], image_texture.inputs['Vector'])
             
             # Csak akkor linkeljük a textúrát, ha sikeresen betöltődött
             if image_texture.image:
@@ -236,8 +211,7 @@ def export_srobj(path, context):
     meshname = obj.name
     groupnames = []
     # A vertex group-ok tárolása: [group1_idx, group2_idx] (255 ha nincs)
-    vertgroups_export = [[255, 255] for _ in range(len(mesh.vertices))] 
-    verts = []
+    vertgroups_export = np.full((len(mesh.vertices), 2), 255, dtype=np.uint8)
     
     for group in obj.vertex_groups:
         groupnames.append(group.name)
@@ -246,105 +220,133 @@ def export_srobj(path, context):
     # A vertex.co a lokális koordináták.
     # A Blender globális koordinátáihoz: obj.matrix_world @ vert.co
     # Azonban az SROBJ valószínűleg lokális koordinátákat vár, így a vert.co megfelelő
-    for v_idx, vert in enumerate(mesh.vertices):
-        # A Blender (X, Y, Z) -> Silkroad (X, Z, -Y) konverzió exportáláskor
-        verts.append((vert.co.x, vert.co.z, -vert.co.y))
-
-        current_groups_for_vert = []
-        for vg_entry in vert.groups:
-            # Csak azokat a csoportokat vesszük figyelembe, amelyeknek 0-nál nagyobb súlyuk van
-            if vg_entry.weight > 0.0001: # Kis tolerancia a lebegőpontos számokhoz
-                current_groups_for_vert.append(vg_entry.group)
-        
-        # Silkroad formátum feltételezi, hogy max 2 csoportot kezel
-        if len(current_groups_for_vert) > 0:
-            vertgroups_export[v_idx][0] = current_groups_for_vert[0]
-        if len(current_groups_for_vert) > 1:
-            vertgroups_export[v_idx][1] = current_groups_for_vert[1]
-        # Ha több mint 2 csoportja van egy vertexnek, a többi figyelmen kívül marad
-        if len(current_groups_for_vert) > 2:
-            print(f"Figyelem: A {v_idx} vertexnek több mint 2 vertex csoportja van. Csak az első kettő kerül exportálásra.")
+    vert_count = len(mesh.vertices)
+    co = np.empty(vert_count * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", co)
+    co = co.reshape(vert_count, 3)
+    # A Blender (X, Y, Z) -> Silkroad (X, Z, -Y) konverzió exportáláskor, egyben az egész tömbön
+    verts = np.column_stack((co[:, 0], co[:, 2], -co[:, 1]))
+
+    # Egyetlen menetben, egy lapos float tömbbe gyűjtjük a (vertex, csoport, súly) hármasokat, a többi már NumPy.
+    # Vertex csoportok nélküli objektumnál a vertexek bejárása teljesen kimarad.
+    if obj.vertex_groups:
+        vg_entries = np.fromiter(
+            chain.from_iterable(
+                (v_idx, vg_entry.group, vg_entry.weight)
+                for v_idx, vert in enumerate(mesh.vertices) for vg_entry in vert.groups
+            ),
+            dtype=np.float64
+        ).reshape(-1, 3)
+    else:
+        vg_entries = np.empty((0, 3), dtype=np.float64)
+    # Csak azokat a csoportokat vesszük figyelembe, amelyeknek 0-nál nagyobb súlyuk van
+    vg_entries = vg_entries[vg_entries[:, 2] > 0.0001] # Kis tolerancia a lebegőpontos számokhoz
+    vg_verts = vg_entries[:, 0].astype(np.int64)
+    vg_groups = vg_entries[:, 1].astype(np.int64)
+    if len(vg_groups) and vg_groups.max() >= 255:
+        print("Figyelem: A 254-nél nagyobb indexű vertex csoportok nem exportálhatók (255 = nincs csoport).")
+        vg_verts, vg_groups = vg_verts[vg_groups < 255], vg_groups[vg_groups < 255]
+
+    # Vertexen belüli sorszám (a gyűjtés vertex sorrendben történt, így a bejegyzések már csoportosítva vannak)
+    unique_verts, first_idx, counts = np.unique(vg_verts, return_index=True, return_counts=True)
+    rank = np.arange(len(vg_verts)) - np.repeat(first_idx, counts)
+
+    # Silkroad formátum feltételezi, hogy max 2 csoportot kezel
+    for slot in (0, 1):
+        vertgroups_export[vg_verts[rank == slot], slot] = vg_groups[rank == slot]
+    # Ha több mint 2 csoportja van egy vertexnek, a többi figyelmen kívül marad
+    for v_idx in unique_verts[counts > 2].tolist():
+        print(f"Figyelem: A {v_idx} vertexnek több mint 2 vertex csoportja van. Csak az első kettő kerül exportálásra.")
 
 
     uv_layer = mesh.uv_layers.active
     if not uv_layer:
-        print("Figyelem: Nincs aktív UV map található az exportáláshoz. Az UV koordináták 0,0-ra lesznek beállítva.")
-    
-    unique_uv_map = {}
-    exported_uv_list = []
-    unique_normals_map = {}
-    exported_normal_list = []
+        print("Figyelem: Nincs aktív UV map található az exportáláshoz. A 'vt' szekció kimarad, a face-ek 'v//vn' alakban kerülnek kiírásra.")
     
-    face_data_for_export = []
-    
-    # A loop_triangles garantálja, hogy a mesh háromszögekre van bontva
-    # Ez Blender 2.8+ esetén a loop.normal helyett használatos a face normalhoz.
-    mesh.calc_loop_triangles() 
-
-    for tri in mesh.loop_triangles: # loop_triangles használata polygonok helyett
-        # A Blender normalja (poly.normal) már objektum lokális.
-        bl_normal = tri.normal
-        # A Silkroad koordináta-rendszerhez illeszkedő normal konverziója (Y és Z felcserélése)
-        sr_normal = mathutils.Vector((bl_normal.x, bl_normal.z, -bl_normal.y)) # X, Z, -Y a normalhoz
-        sr_normal.normalize()
-
-        normal_key = tuple(round(coord, 6) for coord in sr_normal)
-        if normal_key not in unique_normals_map:
-            unique_normals_map[normal_key] = len(exported_normal_list)
-            exported_normal_list.append(sr_normal)
-        face_normal_idx = unique_normals_map[normal_key]
-
-        poly_face_data = []
-        for loop_idx in tri.loops: # loop_indices helyett tri.loops használata
-            v_idx = mesh.loops[loop_idx].vertex_index
-
-            uv_coord = uv_layer.data[loop_idx].uv if uv_layer else mathutils.Vector((0.0, 0.0))
-            uv_key = tuple(round(coord, 6) for coord in uv_coord)
-            if uv_key not in unique_uv_map:
-                unique_uv_map[uv_key] = len(exported_uv_list)
-                exported_uv_list.append(uv_coord)
-            uv_idx = unique_uv_map[uv_key]
-            
-            poly_face_data.append((v_idx, uv_idx, face_normal_idx))
-        
-        face_data_for_export.append(poly_face_data)
+    if len(mesh.loops) == 3 * len(mesh.polygons):
+        # Már háromszögelt mesh: a polygonok maguk a háromszögek, a loopok sorban követik egymást,
+        # így nincs szükség a loop_triangles újraszámolására
+        tri_count = len(mesh.polygons)
+        tri_normals = np.empty(tri_count * 3, dtype=np.float32)
+        mesh.polygons.foreach_get("normal", tri_normals)
+        tri_loops = np.arange(tri_count * 3, dtype=np.int32)
+    else:
+        # A loop_triangles garantálja, hogy a mesh háromszögekre van bontva
+        # Ez Blender 2.8+ esetén a loop.normal helyett használatos a face normalhoz.
+        mesh.calc_loop_triangles() 
+
+        tri_count = len(mesh.loop_triangles)
+        tri_normals = np.empty(tri_count * 3, dtype=np.float32)
+        mesh.loop_triangles.foreach_get("normal", tri_normals)
+        tri_loops = np.empty(tri_count * 3, dtype=np.int32)
+        mesh.loop_triangles.foreach_get("loops", tri_loops)
+    loop_verts = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loop_verts)
+
+    # A Silkroad koordináta-rendszerhez illeszkedő normal konverziója (X, Z, -Y), majd normalizálás
+    tri_normals = tri_normals.reshape(tri_count, 3)
+    sr_normals = np.column_stack((tri_normals[:, 0], tri_normals[:, 2], -tri_normals[:, 1]))
+    lengths = np.linalg.norm(sr_normals, axis=1, keepdims=True)
+    np.divide(sr_normals, lengths, out=sr_normals, where=lengths > 0) # helyben, a nulla hosszúak változatlanok
+
+    # Duplikált normalok és UV-k összevonása: 6 tizedesre kvantált egész értékek egyetlen int64 kulcsba pakolva,
+    # így a np.unique 1D tömbön rendez (a 2D axis=0 változatnál jóval gyorsabb)
+    n_q = np.rint(sr_normals.astype(np.float64) * 1e6).astype(np.int64)
+    n_key = ((n_q[:, 0] + (1 << 20)) << 42) | ((n_q[:, 1] + (1 << 20)) << 21) | (n_q[:, 2] + (1 << 20)) # |n| <= 1e6 < 2^20
+    _, n_first, normal_inv = np.unique(n_key, return_index=True, return_inverse=True)
+    exported_normal_list = n_q[n_first] / 1e6
+
+    if uv_layer:
+        loop_uvs = np.empty(len(mesh.loops) * 2, dtype=np.float32)
+        uv_layer.data.foreach_get("uv", loop_uvs)
+        tri_uvs = loop_uvs.reshape(-1, 2)[tri_loops]
+
+        uv_q = np.rint(tri_uvs.astype(np.float64) * 1e6).astype(np.int64)
+        uv_key = (uv_q[:, 0] & 0xFFFFFFFF) | ((uv_q[:, 1] & 0xFFFFFFFF) << 32)
+        _, uv_first, uv_inv = np.unique(uv_key, return_index=True, return_inverse=True)
+        exported_uv_list = uv_q[uv_first] / 1e6
+
+        # Háromszögenként 3 sarok: (v_idx, uv_idx, vn_idx)
+        face_data_for_export = np.empty((tri_count, 3, 3), dtype=np.int64)
+        face_data_for_export[:, :, 1] = uv_inv.reshape(tri_count, 3)
+        face_tpl = SROBJ_F_TPL
+    else:
+        # UV nélkül: (v_idx, vn_idx) sarkonként, 'vt' szekció nélkül
+        exported_uv_list = np.empty((0, 2))
+        face_data_for_export = np.empty((tri_count, 3, 2), dtype=np.int64)
+        face_tpl = SROBJ_F_NOUV_TPL
+    face_data_for_export[:, :, 0] = loop_verts[tri_loops].reshape(tri_count, 3)
+    face_data_for_export[:, :, -1] = normal_inv.reshape(tri_count, 1)
 
-    lines = []
-    
-    lines.append('#SROBJ by Perry\'s Blender plugin (Updated by AI Assistant).\n')
-    lines.append(f'o {meshname}\n')
+    # A teljes kimenet egyetlen bytearray pufferbe kerül (szekciónként egy bytes join), majd egyetlen írással a lemezre
+    buf = bytearray(b'#SROBJ by Perry\'s Blender plugin (Updated by AI Assistant).\n')
+    buf += f'o {meshname}\n'.encode('utf-8')
 
     # Group nevek exportálása
-    for groupname in groupnames:
-        lines.append(f'gn {groupname}\n')
-    
+    buf += ''.join(f'gn {groupname}\n' for groupname in groupnames).encode('utf-8')
+
     # Vertex group indexek exportálása
-    for groups in vertgroups_export:
-        lines.append(f'vg {groups[0]}/{groups[1]}\n')
-    
-    # Vertex koordináták exportálása
-    for vert_co in verts:
-        # **KRITIKUS HIBA JAVÍTVA:** Korábban vert_co[0]-t kétszer használt, most helyesen X, Z, -Y
-        lines.append(f'v {vert_co[0]:.6f} {vert_co[1]:.6f} {vert_co[2]:.6f}\n') 
-    
+    buf += b''.join(SROBJ_VG_TPL % tuple(row) for row in vertgroups_export.tolist())
+
+    # Vertex koordináták exportálása (X, Z, -Y)
+    buf += b''.join(SROBJ_V_TPL % tuple(row) for row in verts.tolist())
+
     # Normal vektorok exportálása
-    for norm_co in exported_normal_list:
-        lines.append(f'vn {norm_co[0]:.6f} {norm_co[1]:.6f} {norm_co[2]:.6f}\n')
-        
+    buf += b''.join(SROBJ_VN_TPL % tuple(row) for row in exported_normal_list.tolist())
+
     # UV koordináták exportálása
-    for uv_co in exported_uv_list:
-        lines.append(f'vt {uv_co[0]:.6f} {uv_co[1]:.6f}\n')
-            
+    buf += b''.join(SROBJ_VT_TPL % tuple(row) for row in exported_uv_list.tolist())
+
     # Face-ek exportálása (1-alapú indexeléssel)
-    for face_loops in face_data_for_export:
-        line_parts = []
-        for v_idx, uv_idx, vn_idx in face_loops:
-            line_parts.append(f"{v_idx+1}/{uv_idx+1}/{vn_idx+1}")
-        lines.append(f"f {' '.join(line_parts)}\n")
-            
+    buf += b''.join(face_tpl % tuple(row) for row in (face_data_for_export + 1).reshape(tri_count, 3 * face_data_for_export.shape[2]).tolist())
+
+    # A korábbi szöveges módú írással megegyező sorvégek (Windows alatt CRLF)
+    if os.linesep != '\n':
+        buf = buf.replace(b'\n', os.linesep.encode('ascii'))
+
     try:
-        with open(path, 'w', encoding='utf-8') as f: # encoding='utf-8' hozzáadva
-            f.writelines(lines)
+        with open(path, 'wb') as f:
+            f.write(buf)
     except Exception as e:
         raise Exception(f"Hiba az SROBJ fájl írása közben '{path}': {e}")
 
@@ -383,6 +385,10 @@ class SROBJ_OT_ImportUI(Operator):
     bl_label = "SROBJ importálása"
     bl_description = "SROBJ fájl importálása opcionális textúra hozzárendeléssel."
 
+    @classmethod
+    def poll(cls, context):
+        return bool(context.scene.srobj_props.import_srobj_path)
+
     def execute(self, context):
         props = context.scene.srobj_props
         if not props.import_srobj_path:
@@ -404,6 +410,10 @@ class SROBJ_OT_ExportUI(Operator):
     bl_label = "SROBJ exportálása"
     bl_description = "A kiválasztott MESH objektum exportálása .srobj fájlba."
 
+    @classmethod
+    def poll(cls, context):
+        return context.object is not None and context.object.type == 'MESH'
+
     def execute(self, context):
         props = context.scene.srobj_props
         if not props.export_srobj_path:
@@ -1,10 +1,13 @@
 import bpy
 import os
-import bmesh
-import mathutils # mathutils importálva
+import re
+import mmap
+import numpy as np
+from itertools import chain, islice
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from bpy.props import StringProperty, PointerProperty, BoolProperty
 from bpy.types import Operator, Panel, PropertyGroup
-from bpy_extras.io_utils import ImportHelper, ExportHelper
 
 bl_info = {
     "name": "Silkroad OBJ Importer (Advanced)", # Renamed to Importer only
@@ -16,188 +19,243 @@ bl_info = {
     "category": "Import-Export"
 }
 
-# --- Helper Functions ---
+# --- SROBJ Parsing (NumPy based) ---
+
+# Byte-level line patterns. 'f' line bodies are captured up to a trailing '#' comment; their corners are read from the joined bodies.
+SROBJ_V_RE = re.compile(rb'^[ \t]*v[ \t]+(\S+)[ \t]+(\S+)[ \t]+(\S+)', re.M)
+SROBJ_VT_RE = re.compile(rb'^[ \t]*vt[ \t]+(\S+)[ \t]+(\S+)', re.M)
+SROBJ_F_LINE_RE = re.compile(rb'^[ \t]*f\b([^\r\n#]*)', re.M)
+SROBJ_PREFIX_RE = {key: re.compile(rb'^[ \t]*' + key + rb'\b', re.M) for key in (b'v', b'vt')}
+
+# Face corner patterns, anchored to the start of a token. The generic one accepts v, v/vt, v/vt/vn and v//vn.
+# The specialized ones are picked once from the first corner; they have no optional groups, so no empty
+# fields need patching. Value: (pattern, captured fields per corner).
+SROBJ_CORNER_RE = re.compile(rb'(?<!\S)(-?\d+)(?:/(-?\d*))?\S*')
+SROBJ_CORNER_FAST_RE = {
+    'v/vt': (re.compile(rb'(?<!\S)(-?\d+)/(-?\d+)\S*'), 2),  # also covers v/vt/vn
+    'v': (re.compile(rb'(?<!\S)(-?\d+)(?://-?\d+)?(?!\S)'), 1),  # also covers v//vn
+}
 
-def name_exists(name):
-    """Checks if an object with this name already exists in Blender."""
-    return name in bpy.data.objects
+def detect_face_format(token):
+    """Return the fast-path key for a face corner token (b'1', b'1/2', b'1/2/3' or b'1//3')."""
+    return 'v' if b'//' in token or b'/' not in token else 'v/vt'
 
-# --- Import Function (bmesh based, with texture assignment) ---
+def read_fields(pattern, data, count, dtype, fill_empty=False):
+    """
+    Stream the captured fields of every match straight into a preallocated array of exactly `count` items.
+    Raises ValueError if fewer fields arrive (a malformed line is not matched) or a field does not convert.
+    """
+    groups = (m.groups() for m in pattern.finditer(data))
+    fields = chain.from_iterable(groups)
+    if fill_empty:
+        fields = (x or b'0' for x in fields)
+    try:
+        return np.fromiter(fields, dtype=dtype, count=count)
+    finally:
+        groups.close() # releases the last match object, otherwise the mmap cannot be closed after an error
 
-def import_srobj_advanced(filepath, texturepath, flip_uv_v=False):
+def fan_triangulate(corners, corner_counts):
     """
-    Import Silkroad OBJ (.srobj) file using bmesh,
-    with texture assignment and optional UV V-flip.
+    Fan-triangulate faces of k >= 3 corners into (0, i, i+1) for i in 1..k-2, as one NumPy gather.
+    corners holds the per-corner data of all faces in file order; returns shape (T, 3, ...).
+    """
+    if (corner_counts == 3).all():
+        return corners.reshape(len(corner_counts), 3, *corners.shape[1:])
+    starts = np.cumsum(corner_counts) - corner_counts
+    tri_counts = corner_counts - 2
+    first = np.repeat(starts, tri_counts)
+    i = np.arange(int(tri_counts.sum())) - np.repeat(np.cumsum(tri_counts) - tri_counts, tri_counts) + 1
+    return corners[np.stack((first, first + i, first + i + 1), axis=1)]
+
+def parse_srobj(filepath, flip_uv_v=False):
+    """
+    Read an SROBJ file into NumPy arrays; n-gon faces are fan-triangulated, UVs optionally V-flipped.
+    Returns: verts (N,3) float32 in Blender axes, uvs (M,2) float32, faces (F,3,2) int32 (v_idx, uv_idx).
     """
-    verts = []
-    uv_coords_from_file = []
-    faces_data = []
+    # Memory-map the file: the regex sweeps run directly over the mapped pages, without a user-space copy
+    with open(filepath, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return np.empty((0, 3), np.float32), np.empty((0, 2), np.float32), np.empty((0, 3, 2), np.int32)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            # Pass 1: count line prefixes so every array can be allocated at its exact size
+            nv, nvt = (len(SROBJ_PREFIX_RE[key].findall(data)) for key in (b'v', b'vt'))
+
+            # Pass 2: stream match fields straight into the preallocated arrays (no list of tuples)
+            try:
+                verts = read_fields(SROBJ_V_RE, data, nv * 3, np.float32).reshape(nv, 3)
+            except ValueError:
+                raise ValueError("Invalid 'v' line format in file.")
+            try:
+                uvs = read_fields(SROBJ_VT_RE, data, nvt * 2, np.float32).reshape(nvt, 2)
+            except ValueError:
+                raise ValueError("Invalid 'vt' line format in file.")
+
+            face_bodies = SROBJ_F_LINE_RE.findall(data)
+
+    # Faces: corners per line, then every corner of the file in one sweep over the joined line bodies
+    corner_counts = np.fromiter((len(body.split()) for body in face_bodies), dtype=np.int64, count=len(face_bodies))
+    if (corner_counts < 3).any():
+        raise ValueError("Invalid 'f' line format in file. Faces require at least 3 vertices.")
+    face_blob = b'\n'.join(face_bodies)
+    n_corners = int(corner_counts.sum())
+
+    # Try the specialized pattern for the file's corner format first; a file mixing corner formats makes
+    # the field count fall short, in which case the generic pattern is used instead
+    corners = None
+    if n_corners:
+        pattern, corner_fields = SROBJ_CORNER_FAST_RE[detect_face_format(face_blob.split(None, 1)[0])]
+        try:
+            corners = read_fields(pattern, face_blob, n_corners * corner_fields, np.int32).reshape(n_corners, corner_fields)
+        except ValueError:
+            corners = None
+        if corners is not None and corner_fields == 1:
+            corners = np.concatenate((corners, np.zeros_like(corners)), axis=1) # no UV index -> -1 after the shift
+    if corners is None:
+        try:
+            corners = read_fields(SROBJ_CORNER_RE, face_blob, n_corners * 2, np.int32, fill_empty=True).reshape(n_corners, 2)
+        except ValueError:
+            raise ValueError("Invalid 'f' line format in file.")
 
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f: # Added encoding='utf-8' for more robust file reading
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith("#"):
-                    continue
-                parts = line.split()
-                if not parts: # Check for empty lines after split
-                    continue
-
-                if parts[0] == "o":
-                    # After 'o' line, we read the object name, but in srobj format it's not always used
-                    # The code later generates the object name from the filename, which is fine.
-                    # If the 'o' name in the file needs to be used:
-                    # obj_name_from_file = parts[1] if len(parts) > 1 else "unnamed_object"
-                    pass # Currently not using it, but good to know for future reference
-                elif parts[0] == "v":
-                    # Silkroad (X, Z, Y) -> Blender (X, -Y, Z)
-                    # This conversion is specific to Silkroad and is correct if this is the desired behavior.
-                    if len(parts) < 4: raise ValueError(f"Invalid 'v' line format: {line}")
-                    x, z, y = map(float, parts[1:4])
-                    verts.append((x, -y, z))
-                elif parts[0] == "vt":
-                    if len(parts) < 3: raise ValueError(f"Invalid 'vt' line format: {line}")
-                    u, v = map(float, parts[1:3])
-                    uv_coords_from_file.append((u, v))
-                elif parts[0] == "f":
-                    if len(parts) < 4: raise ValueError(f"Invalid 'f' line format: {line}. Faces require at least 3 vertices.")
-                    face_verts_uvs = []
-                    # Taking only the first 3 vertices (triangles)
-                    # Additional check to ensure string is not empty before converting to int
-                    for part in parts[1:4]:
-                        indices = part.split('/')
-                        if not indices[0]: raise ValueError(f"Empty vertex index in 'f' line: {line}")
-                        v_idx = int(indices[0]) - 1
-                        
-                        uv_idx = -1
-                        if len(indices) > 1 and indices[1]: # Check if UV index exists and is not empty
-                            uv_idx = int(indices[1]) - 1
-                        
-                        face_verts_uvs.append((v_idx, uv_idx))
-                    
-                    if len(face_verts_uvs) == 3:
-                        faces_data.append(tuple(face_verts_uvs))
-                    else:
-                        print(f"Warning: Non-triangular face found in SROBJ file, skipping: {line}")
+    if flip_uv_v:
+        # One array op at import time instead of a Mapping node evaluated by the shader
+        uvs[:, 1] = 1.0 - uvs[:, 1]
+
+    # (v, vt) pairs per corner, 0-based; a missing UV index becomes -1
+    corners -= 1
+    faces = fan_triangulate(corners, corner_counts)
+
+    # Silkroad (X, Z, Y) -> Blender (X, -Y, Z), applied to the whole array at once
+    verts = verts[:, [0, 2, 1]]
+    verts[:, 1] *= -1.0
+
+    return verts, uvs, faces
+
+# --- Material Template ---
+
+SROBJ_TEMPLATE_MATERIAL = "SROBJ_Template_Material"
+
+def get_template_material():
+    """
+    Return the shared texture material template (UV Map -> Image Texture, Principled BSDF -> Output),
+    building it on first use. It is looked up by name, so it is rebuilt if the datablock was removed.
+    """
+    mat = bpy.data.materials.get(SROBJ_TEMPLATE_MATERIAL)
+    if mat is not None:
+        return mat
+
+    mat = bpy.data.materials.new(name=SROBJ_TEMPLATE_MATERIAL)
+    mat.use_nodes = True
+    nodes = mat.node_tree.nodes
+    links = mat.node_tree.links
+
+    # Delete all existing nodes for a clean start
+    for node in nodes:
+        nodes.remove(node)
+
+    principled_bsdf = nodes.new(type='ShaderNodeBsdfPrincipled')
+    principled_bsdf.name = "Principled BSDF"
+    principled_bsdf.location = (400, 0)
+
+    material_output = nodes.new(type='ShaderNodeOutputMaterial')
+    material_output.location = (600, 0)
+
+    image_texture = nodes.new(type='ShaderNodeTexImage')
+    image_texture.name = "Image Texture"
+    image_texture.location = (0, 0)
+    image_texture.interpolation = 'Closest'
 
+    # Add UV Map node to explicitly use the "UVMap" layer
+    uv_map_node = nodes.new(type='ShaderNodeUVMap')
+    uv_map_node.location = (-600, 100)
+    uv_map_node.uv_map = "UVMap" # Ensure it uses the correct UV Map
+
+    # The V-flip is baked into the UV data by the parser, so no Mapping node is needed
+    links.new(uv_map_node.outputs['UV'], image_texture.inputs['Vector'])
+    links.new(principled_bsdf.outputs['BSDF'], material_output.inputs['Surface'])
+    return mat
+
+# --- Import Function (foreach_set based, with texture assignment) ---
+
+def import_srobj_advanced(filepath, texturepath, flip_uv_v=False, parsed=None):
+    """
+    Import Silkroad OBJ (.srobj) file by writing mesh buffers directly,
+    with texture assignment and optional UV V-flip.
+    `parsed` may hold the parse_srobj() result computed ahead of time (e.g. in a worker thread).
+    """
+    try:
+        verts, uv_coords_from_file, faces_data = parsed if parsed is not None else parse_srobj(filepath, flip_uv_v)
     except Exception as e:
         raise Exception(f"Error reading SROBJ file '{filepath}': {e}")
 
-    # Create Mesh and Object using bmesh
-    base_name = os.path.basename(filepath).split('.')[0]
-    final_obj_name = base_name
-    idx = 0
-    while name_exists(final_obj_name):
-        idx += 1
-        final_obj_name = f"{base_name}.{idx:03d}"
-    
-    mesh = bpy.data.meshes.new(final_obj_name + "_Mesh")
-    obj = bpy.data.objects.new(final_obj_name, mesh)
+    # Create Mesh and Object
+    # Blender resolves name clashes itself (.001, .002, ...) at C speed, no Python probing loop needed
+    base_name = os.path.splitext(os.path.basename(filepath))[0]
+    mesh = bpy.data.meshes.new(base_name + "_Mesh")
+    obj = bpy.data.objects.new(base_name, mesh)
+    final_obj_name = obj.name
     bpy.context.collection.objects.link(obj)
     bpy.context.view_layer.objects.active = obj
     bpy.context.view_layer.update() # Can be important when adding the object
 
-    bm = bmesh.new()
-    # Original: bm.from_mesh(mesh) - not needed if starting with an empty mesh
-    
-    bm_verts = [bm.verts.new(v) for v in verts]
-    bm.verts.ensure_lookup_table()
-
-    # Important: Create UV layer after bm.from_mesh(mesh) or bm.verts.new() calls are finished,
-    # and bmesh already contains vertices.
-    uv_layer = bm.loops.layers.uv.new("UVMap")
-
-    # Assign Faces and UVs
-    for face_info in faces_data:
-        try:
-            # Ensure vertex indices are valid
-            bm_face_verts = []
-            for v_idx, _ in face_info:
-                if v_idx < 0 or v_idx >= len(bm_verts):
-                    raise IndexError(f"Invalid vertex index ({v_idx}) in face: {face_info}")
-                bm_face_verts.append(bm_verts[v_idx])
-            
-            # Check if face contains non-duplicate vertices
-            if len(set(bm_face_verts)) != 3:
-                print(f"Warning: Duplicate vertices in face {face_info}. Skipping.")
-                continue
-
-            bm_face = bm.faces.new(tuple(bm_face_verts))
-            bm_face.normal_update() # Update normal after face creation
-            
-            for loop, (v_idx, uv_idx) in zip(bm_face.loops, face_info):
-                if uv_idx != -1 and uv_idx < len(uv_coords_from_file):
-                    uv_coord = uv_coords_from_file[uv_idx]
-                    # UV V-flip can also be applied here at bmesh level if needed
-                    # Currently, it's in the material node, which is generally better as it can be modified
-                    loop[uv_layer].uv = uv_coord
-                else:
-                    print(f"Warning: Invalid UV index {uv_idx} for vertex {v_idx} in face {face_info}. UV not set.")
-        except ValueError as e:
-            print(f"Warning: Failed to create face with data {face_info} - {e}. Skipping.")
-        except IndexError as e:
-            print(f"Error: Invalid vertex or UV index in face {face_info}: {e}. Skipping.")
-        except Exception as e:
-            print(f"Unexpected error occurred while processing face {face_info}: {e}. Skipping.")
-
-    # Check geometry in bmesh (optional, can be slow for large files)
-    # try:
-    #     bm.verts.ensure_lookup_table()
-    #     bm.edges.ensure_lookup_table()
-    #     bm.faces.ensure_lookup_table()
-    # except Exception as e:
-    #     print(f"Warning: Error updating bmesh lookup tables: {e}")
-
-    bm.to_mesh(mesh)
-    mesh.update()
-    bm.free()
+    # Validate all faces with vectorized masks before any buffer reaches the mesh:
+    # out-of-range vertex indices, then degenerate triangles (a repeated vertex)
+    fv = faces_data[:, :, 0]
+    out_of_range = ((fv < 0) | (fv >= len(verts))).any(axis=1)
+    if out_of_range.any():
+        print(f"Error: {int(out_of_range.sum())} faces with invalid vertex index. Skipping.")
+        faces_data = faces_data[~out_of_range]
+        fv = faces_data[:, :, 0]
+    bad = (fv[:, 0] == fv[:, 1]) | (fv[:, 1] == fv[:, 2]) | (fv[:, 0] == fv[:, 2])
+    if bad.any():
+        print(f"Warning: {int(bad.sum())} faces with duplicate vertices. Skipping.")
+        faces_data = faces_data[~bad]
+
+    # Push raw buffers straight into the Mesh: no bmesh shadow copy, no per-vertex/per-face Python calls
+    num_tris = len(faces_data)
+    mesh.vertices.add(len(verts))
+    mesh.vertices.foreach_set("co", verts.ravel())
+    mesh.loops.add(num_tris * 3)
+    mesh.loops.foreach_set("vertex_index", faces_data[:, :, 0].ravel())
+    mesh.polygons.add(num_tris)
+    mesh.polygons.foreach_set("loop_start", np.arange(0, num_tris * 3, 3, dtype=np.int32))
+
+    # UVs in loop order; invalid UV indices are left at (0, 0)
+    uv_layer = mesh.uv_layers.new(name="UVMap")
+    uv_idx = faces_data[:, :, 1].ravel()
+    uv_ok = (uv_idx >= 0) & (uv_idx < len(uv_coords_from_file))
+    if not uv_ok.all():
+        print(f"Warning: {int((~uv_ok).sum())} loops with invalid UV index. UV not set for these.")
+    loop_uvs = np.zeros((len(uv_idx), 2), dtype=np.float32)
+    loop_uvs[uv_ok] = uv_coords_from_file[uv_idx[uv_ok]]
+    uv_layer.data.foreach_set("uv", loop_uvs.ravel())
+
+    # Remove duplicate faces, then build edges; normals are computed lazily by Blender
+    mesh.validate()
+    mesh.update(calc_edges=True)
 
     # --- Texture and Material Assignment ---
-    if texturepath and os.path.exists(texturepath):
+    # No separate os.path.exists() stat: a missing file is reported by the image loader below
+    if texturepath:
         try:
-            mat = bpy.data.materials.new(name=final_obj_name + "_Material")
-            mat.use_nodes = True
+            # Copy the shared node-tree template instead of rebuilding every node and link per import
+            mat = get_template_material().copy()
+            mat.name = final_obj_name + "_Material"
             obj.data.materials.append(mat)
 
             nodes = mat.node_tree.nodes
             links = mat.node_tree.links
+            principled_bsdf = nodes["Principled BSDF"]
+            image_texture = nodes["Image Texture"]
 
-            # Delete all existing nodes for a clean start
-            for node in nodes:
-                nodes.remove(node)
-
-            principled_bsdf = nodes.new(type='ShaderNodeBsdfPrincipled')
-            principled_bsdf.location = (400, 0)
-
-            material_output = nodes.new(type='ShaderNodeOutputMaterial')
-            material_output.location = (600, 0)
-
-            image_texture = nodes.new(type='ShaderNodeTexImage')
             # Check if image loading is successful
             try:
-                image_texture.image = bpy.data.images.load(texturepath)
+                # check_existing reuses an already loaded image with the same path instead of decoding it again
+                image_texture.image = bpy.data.images.load(texturepath, check_existing=True)
             except RuntimeError as e: # More specific error handling for image loading
                 print(f"Error loading texture '{texturepath}': {e}. Please check file format and Blender DDS support.")
                 # Do not raise exception here, so that material can be created without texture at least
                 image_texture.image = None 
-                
-            image_texture.location = (0, 0)
-
-            # Add UV Map node to explicitly use the "UVMap" layer
-            uv_map_node = nodes.new(type='ShaderNodeUVMap')
-            uv_map_node.location = (-600, 100)
-            uv_map_node.uv_map = "UVMap" # Ensure it uses the correct UV Map
-
-            mapping = nodes.new(type='ShaderNodeMapping')
-            mapping.location = (-200, 0)
-            
-            if flip_uv_v:
-                mapping.inputs['Scale'].default_value[1] = -1
-            
-            # Modify links to include UV Map node
-            links.new(uv_map_node.outputs['UV'], mapping.inputs['Vector'])
-            links.new(mapping.outputs['Vector'], image_texture.inputs['Vector'])
-            
+
             # Only link texture if it loaded successfully
             if image_texture.image:
                 links.new(image_texture.outputs['Color'], principled_bsdf.inputs['Base Color'])
@@ -205,17 +263,13 @@ def import_srobj_advanced(filepath, texturepath, flip_uv_v=False):
                 print("Warning: Texture loading failed, setting base color on material.")
                 # We can set a base color if there is no texture
                 principled_bsdf.inputs['Base Color'].default_value = (0.8, 0.8, 0.8, 1.0) # Grey
-                
-            links.new(principled_bsdf.outputs['BSDF'], material_output.inputs['Surface'])
-            
-            image_texture.interpolation = 'Closest'
 
         except Exception as e:
             print(f"Error assigning texture or material: {e}")
             # print(traceback.format_exc()) # For development: print traceback
             raise # Important to propagate error if critical
     else:
-        print(f"No texture path specified or file does not exist: '{texturepath}'. Creating material without texture.")
+        print("No texture path specified. Creating material without texture.")
         mat = bpy.data.materials.new(name=final_obj_name + "_Material_NoTex")
         obj.data.materials.append(mat)
 
@@ -245,6 +299,11 @@ class SROBJProperties(PropertyGroup):
         description="Flip imported UV coordinates vertically (useful for some game textures).",
         default=False # Changed default to False (unchecked)
     )
+    import_whole_folder: BoolProperty(
+        name="Import All in Folder",
+        description="Import every .srobj file from the folder of the selected file (files are parsed in parallel). The texture file is assigned to all of them.",
+        default=False
+    )
     # export_srobj_path and related properties are removed
 
 class SROBJ_OT_ImportUI(Operator):
@@ -259,6 +318,9 @@ class SROBJ_OT_ImportUI(Operator):
             self.report({'ERROR'}, "SROBJ file path is not set.")
             return {'CANCELLED'}
         
+        if props.import_whole_folder:
+            return self.import_folder(props)
+
         try:
             import_srobj_advanced(props.import_srobj_path, props.import_texture_path, props.import_flip_uv_v)
             self.report({'INFO'}, f"Successfully imported: {os.path.basename(props.import_srobj_path)}")
@@ -268,6 +330,39 @@ class SROBJ_OT_ImportUI(Operator):
             return {'CANCELLED'}
         return {'FINISHED'}
 
+    def import_folder(self, props):
+        folder = os.path.dirname(bpy.path.abspath(props.import_srobj_path))
+        try:
+            paths = sorted(entry.path for entry in os.scandir(folder) if entry.is_file() and entry.name.lower().endswith('.srobj'))
+        except OSError as e:
+            self.report({'ERROR'}, f"Cannot read folder '{folder}': {e}")
+            return {'CANCELLED'}
+
+        # File reading + parsing runs in worker threads; Blender data (mesh buffers, materials) may only be
+        # touched from the main thread, so objects are built here in file order as the results arrive
+        # At most max_workers files are parsed ahead of the main thread (sliding window), so a large folder
+        # never has all of its vertex/UV/face arrays in memory at once
+        imported = 0
+        workers = os.cpu_count() or 1
+        todo = iter(paths)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = deque((path, executor.submit(parse_srobj, path, props.import_flip_uv_v)) for path in islice(todo, workers))
+            while pending:
+                path, future = pending.popleft() # dropping the future frees its arrays once the object is built
+                for next_path in islice(todo, 1):
+                    pending.append((next_path, executor.submit(parse_srobj, next_path, props.import_flip_uv_v)))
+                try:
+                    import_srobj_advanced(path, props.import_texture_path, props.import_flip_uv_v, parsed=future.result())
+                    imported += 1
+                except Exception as e:
+                    print(f"SROBJ Import Error ({os.path.basename(path)}): {e}")
+
+        if not imported:
+            self.report({'ERROR'}, f"No SROBJ file could be imported from '{folder}'.")
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"Successfully imported {imported}/{len(paths)} SROBJ files from '{folder}'.")
+        return {'FINISHED'}
+
 # SROBJ_OT_ExportUI operator is removed.
 
 class VIEW3D_PT_srobj_panel(Panel):
@@ -288,6 +383,7 @@ class VIEW3D_PT_srobj_panel(Panel):
         box.prop(props, "import_srobj_path")
         box.prop(props, "import_texture_path")
         box.prop(props, "import_flip_uv_v")
+        box.prop(props, "import_whole_folder")
         box.operator(SROBJ_OT_ImportUI.bl_idname, text="Import SROBJ")
 
         # --- Export Section (REMOVED) ---
@@ -10,28 +10,32 @@ bl_info = {
 
 import bpy
 import os
-import bmesh
 import struct
 import tempfile
 import io
+import hashlib
 import math
+import functools
+import mmap
+import numpy as np
 
-try:
-    from PIL import Image
-    PILLOW_OK = True
-except ImportError:
-    PILLOW_OK = False
-
-from bpy.props import StringProperty, PointerProperty
+from bpy.props import StringProperty, PointerProperty, BoolProperty
 from bpy.types import Operator, Panel, PropertyGroup
-from mathutils import Matrix, Quaternion, Vector
+from mathutils import Matrix
+
+# Részletes, elemenkénti naplózás csak SRO_DEBUG=1 környezeti változó mellett; alapból csak összesítő sorok.
+SRO_DEBUG = os.environ.get('SRO_DEBUG') == '1'
 
 # --- Segédfüggvények ---
-def read_int(f): return int.from_bytes(f.read(4), 'little')
-def read_short(f): return int.from_bytes(f.read(2), 'little')
-def read_byte(f): return int.from_bytes(f.read(1), 'little')
-def read_float(f): return struct.unpack('<f', f.read(4))[0]
-def read_color4(f): return struct.unpack('<4f', f.read(16))
+# Előre lefordított Struct-ok, hogy a gyakran hívott olvasók ne értelmezzék újra a formátumot.
+_S_I = struct.Struct('<I'); _S_H = struct.Struct('<H'); _S_B = struct.Struct('<B'); _S_F = struct.Struct('<f')
+_S_3F = struct.Struct('<3f'); _S_4F = struct.Struct('<4f'); _S_10I = struct.Struct('<10I')
+
+def read_int(f): return _S_I.unpack(f.read(4))[0]
+def read_short(f): return _S_H.unpack(f.read(2))[0]
+def read_byte(f): return _S_B.unpack(f.read(1))[0]
+def read_float(f): return _S_F.unpack(f.read(4))[0]
+def read_color4(f): return _S_4F.unpack(f.read(16))
 def read_str(f):
     str_len = read_int(f)
     if str_len <= 0: return ""
@@ -39,19 +43,101 @@ def read_str(f):
     try: return str_bytes.decode("cp949")
     except UnicodeDecodeError: return str_bytes.decode("utf-8", errors='ignore')
 
+# Súlyozási rekord: (csont index, súly, csont index, súly), igazítás nélkül 6 bájt.
+BMS_SKIN_DTYPE = np.dtype([('bi1', 'u1'), ('bw1', '<u2'), ('bi2', 'u1'), ('bw2', '<u2')])
+
+def bms_vertex_dtype(vertex_flag):
+    # Egy vertex rekord: pozíció, normál, UV, a flag-től függő extra blokkok, majd 12 bájt.
+    tail = (8 if vertex_flag & 0x400 else 0) + (36 if vertex_flag & 0x800 else 0) + 12
+    return np.dtype([('pos', '<3f4'), ('normal', '<3f4'), ('uv', '<2f4'), ('tail', f'V{tail}')])
+
+def assign_vertex_weights(obj, bones, weights):
+    # A VertexGroup.add hívásonként egyetlen súlyt fogad, a BMS súlyok pedig folytonosak (normalizáltak), így
+    # súly szerinti csoportosítással szinte egyetlen hívás sem spórolható meg. A csoportokat csontonként egyszer
+    # oldjuk fel (nem vertexenként név szerint), a szűrés NumPy-jal történik. Az első befolyás REPLACE, a második
+    # ADD módban kerül fel, mint korábban.
+    groups = [obj.vertex_groups[b_name] for b_name in bones]
+    for bone_idx, bone_w, mode in ((weights[0], weights[1], 'REPLACE'), (weights[2], weights[3], 'ADD')):
+        sel = np.flatnonzero((bone_w > 0.001) & (bone_idx < len(bones)))
+        for i, bi, w in zip(sel.tolist(), bone_idx[sel].tolist(), bone_w[sel].tolist()):
+            groups[bi].add((i,), w, mode)
+
 # --- Képfeldolgozás ---
+# A Pillow-t csak az első textúra konverziónál importáljuk, így nem lassítja az addon betöltését.
+@functools.cache
+def pil_image_module():
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    return Image
+
+# (DDJ útvonal, módosítási idő) -> már konvertált PNG útvonal az aktuális Blender munkamenetben.
+ddj_cache = {}
+
 def convert_ddj_to_png(ddj_path):
-    if not PILLOW_OK: raise ImportError("A Pillow (PIL) könyvtár szükséges a DDJ konverzióhoz.")
+    Image = pil_image_module()
+    if Image is None: raise ImportError("A Pillow (PIL) könyvtár szükséges a DDJ konverzióhoz.")
     try:
-        with open(ddj_path, 'rb') as f:
-            f.seek(20); dds_data = f.read()
-        image = Image.open(io.BytesIO(dds_data))
-        temp_png_path = os.path.join(tempfile.gettempdir(), os.path.basename(ddj_path) + ".png")
-        image.save(temp_png_path, 'PNG')
+        cache_key = (os.path.abspath(ddj_path), os.stat(ddj_path).st_mtime_ns)
+        cached_path = ddj_cache.get(cache_key)
+        if cached_path and os.path.exists(cached_path): return cached_path
+        # A fájlt mmap-eljük: a hash közvetlenül a leképezett memórián fut, és csak a DDS rész (a 20 bájtos
+        # DDJ fejléc után) másolódik egyszer a Pillow számára.
+        with open(ddj_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # A PNG nevét a tartalom hash-éből képezzük, így egy korábbi importnál már konvertált textúrát újrahasznosítunk.
+            digest = hashlib.blake2b(mm, digest_size=16).hexdigest()
+            temp_png_path = os.path.join(tempfile.gettempdir(), f"sro_{digest}.png")
+            if not os.path.exists(temp_png_path):
+                image = Image.open(io.BytesIO(mm[20:]))
+                # Ideiglenes névre mentünk, hogy egy félbeszakadt mentés ne maradjon érvényes cache bejegyzésként.
+                image.save(temp_png_path + ".part", 'PNG')
+                os.replace(temp_png_path + ".part", temp_png_path)
+        ddj_cache[cache_key] = temp_png_path
         return temp_png_path
     except Exception as e:
         print(f"DDJ -> PNG konverziós hiba: {e}"); return None
 
+# (DDJ útvonal, módosítási idő, színtér) -> a belőle létrehozott Blender kép neve az aktuális munkamenetben.
+ddj_image_cache = {}
+
+def load_ddj_image(ddj_path, colorspace='sRGB', pack=False):
+    # Csomagolásnál a dekódolt pixeleket közvetlenül egy új Blender képbe írjuk és azt ágyazzuk a .blend-be
+    # (elmarad a PNG fájl írása és a Blender oldali újradekódolás). Csomagolás nélkül a lemezen lévő PNG
+    # cache-ből töltünk, mert a generált kép nem kerülne mentésre a .blend fájllal.
+    # Színterenként külön kép készül: ha ugyanaz a DDJ diffuse és normal map is, a Non-Color beállítás
+    # nem rontja el a diffuse képet.
+    Image = pil_image_module()
+    if Image is None: raise ImportError("A Pillow (PIL) könyvtár szükséges a DDJ konverzióhoz.")
+    abs_path = os.path.abspath(ddj_path)
+    cache_key = (abs_path, os.stat(ddj_path).st_mtime_ns, colorspace)
+    source = "|".join(map(str, cache_key))
+    # A név alapján talált képet csak akkor használjuk, ha a forrás tulajdonsága egyezik (átnevezett vagy
+    # más forrásból származó azonos nevű kép esetén újat töltünk be).
+    cached_image = bpy.data.images.get(ddj_image_cache.get(cache_key, ""))
+    if cached_image and cached_image.get("sro_ddj_source") == source: return cached_image
+    image = None
+    if pack:
+        with open(ddj_path, 'rb') as f:
+            f.seek(20); dds_data = f.read()
+        pil_image = Image.open(io.BytesIO(dds_data)).convert('RGBA')
+        pixels = np.asarray(pil_image, dtype=np.float32)[::-1] / 255.0  # Blender alulról felfelé tárolja a sorokat
+        image = bpy.data.images.new(os.path.basename(ddj_path), pil_image.width, pil_image.height, alpha=True)
+        try:
+            image.pixels.foreach_set(pixels.ravel())
+            image.pack()
+        except (AttributeError, RuntimeError) as e:
+            print(f"   [FIGYELEM] Közvetlen pixel írás sikertelen ({e}), PNG konverzió következik.")
+            bpy.data.images.remove(image); image = None
+    if image is None:
+        png_path = convert_ddj_to_png(ddj_path)
+        if not png_path: return None
+        image = bpy.data.images.load(png_path, check_existing=False)
+    image.colorspace_settings.name = colorspace
+    image["sro_ddj_source"] = source
+    ddj_image_cache[cache_key] = image.name
+    return image
+
 # --- BMT Parser ---
 def read_bmt_file(bmt_filepath):
     if not bmt_filepath or not os.path.exists(bmt_filepath): return {}
@@ -79,7 +165,8 @@ def read_bmt_file(bmt_filepath):
                     props['normal_map'] = read_str(f)
                     f.read(4)
                 materials[mat_name] = props
-                print(f"   -> '{mat_name}' anyag beolvasva.")
+                if SRO_DEBUG: print(f"   -> '{mat_name}' anyag beolvasva.")
+            print(f"   -> {len(materials)} anyag beolvasva.")
     except Exception as e:
         print(f"Hiba a BMT fájl olvasása közben: {e}")
     return materials
@@ -101,18 +188,90 @@ def read_bsk_file(bsk_filepath):
                 bone_name = read_str(f)
                 parent_name = read_str(f)
                 f.read(16 + 12)
-                rot_abs = struct.unpack('<4f', f.read(16))
-                pos_abs = struct.unpack('<3f', f.read(12))
+                rot_abs = _S_4F.unpack(f.read(16))
+                pos_abs = _S_3F.unpack(f.read(12))
                 f.seek(16 + 12, 1)
                 child_count = read_int(f)
                 for _ in range(child_count): read_str(f)
                 bones_data.append({"name": bone_name, "parent": parent_name, "pos": pos_abs, "rot": rot_abs})
-                print(f"   -> Csont beolvasva ({i+1}/{bone_count}): {bone_name} (Szülő: {parent_name or 'Nincs'})")
+                if SRO_DEBUG: print(f"   -> Csont beolvasva ({i+1}/{bone_count}): {bone_name} (Szülő: {parent_name or 'Nincs'})")
+            print(f"   -> {len(bones_data)} csont beolvasva.")
     except Exception as e:
         print(f"Hiba a BSK fájl olvasása közben: {e}"); return None
     return bones_data
 
+# --- BMS Parser ---
+def read_bms_file(bms_filepath):
+    # A BMS mesh adatait NumPy tömbökként adja vissza; a nagy blokkokat (vertex, lap, súlyozás) egy-egy
+    # np.frombuffer hívás bontja fel, így nincs Python szintű ciklus rekordonként.
+    bones, weights = [], ()
+    print(f"[LOG] BMS fájl megnyitása: {os.path.basename(bms_filepath)}")
+    # A fájlt egyszer mmap-eljük; az mmap fájlszerű read/seek felülete miatt az olvasó segédfüggvények
+    # változatlanul használhatók rajta, de minden olvasás memóriából történik, rendszerhívás nélkül.
+    with open(bms_filepath, 'rb') as bms_file, mmap.mmap(bms_file.fileno(), 0, access=mmap.ACCESS_READ) as f:
+        if f.read(7) != b"JMXVBMS": raise ValueError("Not a valid BMS file signature.")
+        header_offsets = _S_10I.unpack_from(f, 12)
+        f.seek(12 + _S_10I.size)
+        header = {"vertex_offset": header_offsets[0], "skin_offset": header_offsets[1], "face_offset": header_offsets[2]}
+        print(f"   -> Header beolvasva. Vertex offset: {header['vertex_offset']}, Skin offset: {header['skin_offset']}, Face offset: {header['face_offset']}")
+        f.read(8); vertex_flag = read_int(f); f.read(4)
+        mesh_name_from_bms, mat_name_from_bms = read_str(f), read_str(f)
+        f.read(4)
+        
+        f.seek(header["vertex_offset"]); vcount = read_int(f)
+        print(f" [LOG] {vcount} vertex beolvasása...")
+        # A teljes vertex blokkot egyszerre olvassuk be, és strukturált dtype-pal bontjuk oszlopokra.
+        vertex_dtype = bms_vertex_dtype(vertex_flag)
+        vertex_data = np.frombuffer(f.read(vcount * vertex_dtype.itemsize), dtype=vertex_dtype, count=vcount)
+        verts, normals, uvs = vertex_data['pos'], vertex_data['normal'], vertex_data['uv']
+        print(f"   -> Vertex adatok beolvasva: {len(verts)} pozíció, {len(normals)} normál, {len(uvs)} UV.")
+
+        f.seek(header["face_offset"]); fcount = read_int(f)
+        print(f" [LOG] {fcount} lap (face) beolvasása...")
+        faces = np.frombuffer(f.read(fcount * 6), dtype='<u2', count=fcount * 3).reshape(fcount, 3)[:, ::-1]
+        print(f"   -> Lap adatok beolvasva: {len(faces)} lap.")
+
+        if header["skin_offset"] > 0:
+            f.seek(header["skin_offset"]); bcount = read_int(f)
+            if bcount > 0:
+                print(f" [LOG] {bcount} csont (bone) és súlyozás beolvasása...")
+                bones = [read_str(f) for _ in range(bcount)]
+                if SRO_DEBUG: print(f"   -> Mesh-hez tartozó csontok: {', '.join(bones)}")
+                skin = np.frombuffer(f.read(vcount * BMS_SKIN_DTYPE.itemsize), dtype=BMS_SKIN_DTYPE, count=vcount)
+                total = skin['bw1'].astype(np.float32) + skin['bw2']
+                total[total == 0] = 1.0
+                weights = (skin['bi1'], skin['bw1'] / total, skin['bi2'], skin['bw2'] / total)
+                print(f"   -> Súlyozási adatok beolvasva {len(skin)} vertexhez.")
+    return {"mesh_name": mesh_name_from_bms, "material_name": mat_name_from_bms, "verts": verts, "normals": normals,
+            "uvs": uvs, "faces": faces, "bones": bones, "weights": weights}
+
 # --- Armature Építő ---
+def bone_matrices(bones_data):
+    # Az összes csont 4x4-es mátrixát egyszerre számoljuk NumPy-jal; a BSK kvaternió (X, Y, Z, W) sorrendű.
+    # Ugyanazt a képletet követi, mint a Matrix.Translation(pos) @ Quaternion(...).to_matrix().to_4x4().
+    rots = np.array([b['rot'] for b in bones_data], dtype=np.float64).reshape(-1, 4)
+    x, y, z, w = rots.T
+    mats = np.zeros((len(rots), 4, 4))
+    mats[:, 0, 0] = 1 - 2 * (y * y + z * z); mats[:, 0, 1] = 2 * (x * y - w * z); mats[:, 0, 2] = 2 * (x * z + w * y)
+    mats[:, 1, 0] = 2 * (x * y + w * z); mats[:, 1, 1] = 1 - 2 * (x * x + z * z); mats[:, 1, 2] = 2 * (y * z - w * x)
+    mats[:, 2, 0] = 2 * (x * z - w * y); mats[:, 2, 1] = 2 * (y * z + w * x); mats[:, 2, 2] = 1 - 2 * (x * x + y * y)
+    mats[:, :3, 3] = np.array([b['pos'] for b in bones_data], dtype=np.float64).reshape(-1, 3)
+    mats[:, 3, 3] = 1.0
+    return mats
+
+def parent_first_order(bones_data):
+    # Szülő indexek előre feloldva, és olyan sorrend, amelyben minden szülő megelőzi a gyerekeit.
+    index_by_name = {b['name']: i for i, b in enumerate(bones_data)}
+    parents = [index_by_name.get(b['parent'], -1) if b['parent'] else -1 for b in bones_data]
+    children = [[] for _ in bones_data]
+    for i, p in enumerate(parents):
+        if p >= 0: children[p].append(i)
+    order = [i for i, p in enumerate(parents) if p < 0]
+    for i in order: order.extend(children[i])
+    if len(order) < len(bones_data):  # ciklikus szülő hivatkozás: a maradékot a végére tesszük
+        seen = set(order); order.extend(i for i in range(len(bones_data)) if i not in seen)
+    return parents, order
+
 def create_armature(name, bones_data, context):
     print("[LOG] Armature létrehozása...")
     armature_data = bpy.data.armatures.new(name=name + "_Armature")
@@ -121,24 +280,36 @@ def create_armature(name, bones_data, context):
     context.view_layer.objects.active = armature_obj
     bpy.ops.object.mode_set(mode='EDIT')
     
-    blender_bones = {}
-    for bone_info in bones_data:
-        bl_bone = armature_data.edit_bones.new(name=bone_info['name'])
-        blender_bones[bone_info['name']] = bl_bone
-
-    for bone_info in bones_data:
-        bl_bone = blender_bones[bone_info['name']]
-        if bone_info['parent'] and bone_info['parent'] in blender_bones:
-            bl_bone.parent = blender_bones[bone_info['parent']]
-
-        sro_quat = Quaternion((bone_info['rot'][3], bone_info['rot'][0], bone_info['rot'][1], bone_info['rot'][2]))
-        sro_pos = Vector(bone_info['pos'])
-        bl_bone.matrix = Matrix.Translation(sro_pos) @ sro_quat.to_matrix().to_4x4()
+    # A mátrixokat egyetlen tolist() hívással alakítjuk listává; csontonként csak egy Matrix jön létre.
+    mat_rows = bone_matrices(bones_data).tolist()
+    parents, order = parent_first_order(bones_data)
+    new_bone, to_matrix = armature_data.edit_bones.new, Matrix
+    blender_bones = [None] * len(bones_data)
+    for i in order:
+        bl_bone = new_bone(name=bones_data[i]['name'])
+        blender_bones[i] = bl_bone
+        if parents[i] >= 0 and blender_bones[parents[i]] is not None:
+            bl_bone.parent = blender_bones[parents[i]]
+        bl_bone.matrix = to_matrix(mat_rows[i])
             
     bpy.ops.object.mode_set(mode='OBJECT')
     print(f" [LOG] Armature létrehozva: {armature_obj.name}")
     return armature_obj
     
+# --- Mappa index ---
+# mappa -> (módosítási idő, {kisbetűs fájlnév: teljes útvonal}). Egy mappát csak akkor olvasunk újra, ha megváltozott.
+_autofind_cache = {}
+
+def scan_directory(directory):
+    try: mtime = os.stat(directory).st_mtime_ns
+    except OSError: return {}
+    cached = _autofind_cache.get(directory)
+    if cached and cached[0] == mtime: return cached[1]
+    with os.scandir(directory) as it:
+        entries = {e.name.lower(): e.path for e in it if e.is_file()}
+    _autofind_cache[directory] = (mtime, entries)
+    return entries
+
 # --- UI és Operátorok ---
 class SROProperties(PropertyGroup):
     def _autofind_worker(self, active_path):
@@ -146,20 +317,20 @@ class SROProperties(PropertyGroup):
         
         try:
             setattr(self, "is_autofinding", True)
-            directory = os.path.dirname(active_path)
-            base_name = os.path.splitext(os.path.basename(active_path))[0]
+            entries = scan_directory(os.path.dirname(active_path))
+            base_name = os.path.splitext(os.path.basename(active_path))[0].lower()
             
-            bmt_path = os.path.join(directory, base_name + '.bmt')
-            if not self.import_bmt_filepath and os.path.exists(bmt_path): self.import_bmt_filepath = bmt_path
+            bmt_path = entries.get(base_name + '.bmt')
+            if not self.import_bmt_filepath and bmt_path: self.import_bmt_filepath = bmt_path
 
-            bsk_path = os.path.join(directory, base_name + '.bsk')
-            if not self.import_bsk_filepath and os.path.exists(bsk_path): self.import_bsk_filepath = bsk_path
+            bsk_path = entries.get(base_name + '.bsk')
+            if not self.import_bsk_filepath and bsk_path: self.import_bsk_filepath = bsk_path
 
-            bms_path = os.path.join(directory, base_name + '.bms')
-            if not self.import_bms_filepath and os.path.exists(bms_path): self.import_bms_filepath = bms_path
+            bms_path = entries.get(base_name + '.bms')
+            if not self.import_bms_filepath and bms_path: self.import_bms_filepath = bms_path
             
-            ddj_path = os.path.join(directory, base_name + '.ddj')
-            if not self.import_texture_filepath and os.path.exists(ddj_path): self.import_texture_filepath = ddj_path
+            ddj_path = entries.get(base_name + '.ddj')
+            if not self.import_texture_filepath and ddj_path: self.import_texture_filepath = ddj_path
         finally:
             setattr(self, "is_autofinding", False)
 
@@ -172,6 +343,7 @@ class SROProperties(PropertyGroup):
     import_bmt_filepath: StringProperty(name=".BMT File", subtype='FILE_PATH', description="Select a .bmt material file", update=bmt_update)
     import_bsk_filepath: StringProperty(name=".BSK File", subtype='FILE_PATH', description="Select a .bsk skeleton file", update=bsk_update)
     import_texture_filepath: StringProperty(name="Texture File", subtype='FILE_PATH', description="Default texture if BMT is not used or texture is missing (.ddj only)", update=texture_update)
+    pack_textures: BoolProperty(name="Pack Textures", default=False, description="Embed the imported DDJ textures in the .blend file. When off, textures are loaded from the converted PNG cache in the temp folder")
 
 class SRO_OT_ImportUI(Operator):
     bl_idname = "silkroad.import_bms"
@@ -179,7 +351,7 @@ class SRO_OT_ImportUI(Operator):
 
     def execute(self, context):
         print(f"\n--- Új Importálási Folyamat Indul (v{bl_info['version'][0]}.{bl_info['version'][1]}.{bl_info['version'][2]}) ---")
-        if not PILLOW_OK: self.report({'ERROR'}, "Pillow library (PIL) is not installed. DDJ conversion will fail."); return {'CANCELLED'}
+        if pil_image_module() is None: self.report({'ERROR'}, "Pillow library (PIL) is not installed. DDJ conversion will fail."); return {'CANCELLED'}
         
         props = context.scene.sro_props
         bms_path, bmt_path, bsk_path, texture_path_default = props.import_bms_filepath, props.import_bmt_filepath, props.import_bsk_filepath, props.import_texture_filepath
@@ -207,47 +379,10 @@ class SRO_OT_ImportUI(Operator):
             bmt_data = read_bmt_file(bmt_path)
             bones_data = read_bsk_file(bsk_path)
             
-            verts, normals, uvs, faces, bones, weights = [], [], [], [], [], []
-            mesh_name_from_bms, mat_name_from_bms = "", ""
-
-            print(f"[LOG] BMS fájl megnyitása: {os.path.basename(bms_path)}")
-            with open(bms_path, 'rb') as f:
-                if f.read(7) != b"JMXVBMS": raise ValueError("Not a valid BMS file signature.")
-                f.read(5)
-                header_offsets = struct.unpack('<10I', f.read(40))
-                header = {"vertex_offset": header_offsets[0], "skin_offset": header_offsets[1], "face_offset": header_offsets[2]}
-                print(f"   -> Header beolvasva. Vertex offset: {header['vertex_offset']}, Skin offset: {header['skin_offset']}, Face offset: {header['face_offset']}")
-                f.read(8); vertex_flag = read_int(f); f.read(4)
-                mesh_name_from_bms, mat_name_from_bms = read_str(f), read_str(f)
-                f.read(4)
-                
-                f.seek(header["vertex_offset"]); vcount = read_int(f)
-                print(f" [LOG] {vcount} vertex beolvasása...")
-                for _ in range(vcount):
-                    verts.append(struct.unpack('<3f', f.read(12)))
-                    normals.append(struct.unpack('<3f', f.read(12)))
-                    uvs.append(struct.unpack('<2f', f.read(8)))
-                    if vertex_flag & 0x400: f.read(8)
-                    if vertex_flag & 0x800: f.read(36)
-                    f.read(12)
-                print(f"   -> Vertex adatok beolvasva: {len(verts)} pozíció, {len(normals)} normál, {len(uvs)} UV.")
-
-                f.seek(header["face_offset"]); fcount = read_int(f)
-                print(f" [LOG] {fcount} lap (face) beolvasása...")
-                faces = [tuple(reversed(tuple(read_short(f) for _ in range(3)))) for _ in range(fcount)]
-                print(f"   -> Lap adatok beolvasva: {len(faces)} lap.")
-
-                if header["skin_offset"] > 0:
-                    f.seek(header["skin_offset"]); bcount = read_int(f)
-                    if bcount > 0:
-                        print(f" [LOG] {bcount} csont (bone) és súlyozás beolvasása...")
-                        bones = [read_str(f) for _ in range(bcount)]
-                        print(f"   -> Mesh-hez tartozó csontok: {', '.join(bones)}")
-                        for _ in range(vcount):
-                            bi1, bw1, bi2, bw2 = read_byte(f), read_short(f), read_byte(f), read_short(f)
-                            total = bw1 + bw2 if (bw1 + bw2) > 0 else 1.0
-                            weights.append((bi1, bw1/total, bi2, bw2/total))
-                        print(f"   -> Súlyozási adatok beolvasva {len(weights)} vertexhez.")
+            bms_data = read_bms_file(bms_path)
+            mesh_name_from_bms, mat_name_from_bms = bms_data["mesh_name"], bms_data["material_name"]
+            verts, normals, uvs, faces = bms_data["verts"], bms_data["normals"], bms_data["uvs"], bms_data["faces"]
+            bones, weights = bms_data["bones"], bms_data["weights"]
             
             base_name = mesh_name_from_bms or os.path.splitext(os.path.basename(bms_path))[0]
             container_obj = bpy.data.objects.new(base_name, None)
@@ -259,19 +394,34 @@ class SRO_OT_ImportUI(Operator):
             mesh_obj.parent = container_obj
             context.collection.objects.link(mesh_obj)
             
-            mesh.from_pydata(verts, [], faces); mesh.update()
-            
-            if normals:
+            # A tartományon kívüli indexekre hivatkozó lapokat kihagyjuk, a többit foreach_set-tel töltjük fel.
+            valid_faces = faces[(faces < len(verts)).all(axis=1)]
+            if len(valid_faces) < len(faces):
+                print(f"   [FIGYELEM] {len(faces) - len(valid_faces)} érvénytelen indexű lap kihagyva.")
+            loop_vert_indices = valid_faces.ravel()
+            num_faces = len(valid_faces)
+
+            mesh.vertices.add(len(verts))
+            mesh.vertices.foreach_set("co", verts.ravel())
+            mesh.loops.add(num_faces * 3)
+            mesh.loops.foreach_set("vertex_index", loop_vert_indices.astype(np.int32))
+            mesh.polygons.add(num_faces)
+            mesh.polygons.foreach_set("loop_start", np.arange(0, num_faces * 3, 3, dtype=np.int32))
+
+            # Loop-onkénti UV: a vertex UV-k kigyűjtése a lapok indexei alapján, V tengely tükrözésével.
+            loop_uvs = uvs[loop_vert_indices]
+            loop_uvs[:, 1] = 1.0 - loop_uvs[:, 1]
+            uv_layer = mesh.uv_layers.new(name="UVMap")
+            uv_layer.data.foreach_set("uv", loop_uvs.ravel())
+
+            mesh.validate(verbose=False)
+            mesh.update(calc_edges=True)
+
+            if len(normals):
                 mesh.normals_split_custom_set_from_vertices(normals)
                 mesh.shade_smooth()
                 print(" [LOG] Custom normals sikeresen alkalmazva.")
 
-            bm = bmesh.new(); bm.from_mesh(mesh)
-            uv_layer = bm.loops.layers.uv.new("UVMap")
-            for face in bm.faces:
-                for loop in face.loops: 
-                    loop[uv_layer].uv = (uvs[loop.vert.index][0], 1.0 - uvs[loop.vert.index][1])
-            bm.to_mesh(mesh); bm.free()
             print(" [LOG] UV map sikeresen létrehozva.")
 
             armature_obj = None
@@ -285,10 +435,7 @@ class SRO_OT_ImportUI(Operator):
             if bones and weights:
                 print(f" [LOG] Vertex csoportok létrehozása és súlyozás...")
                 for b_name in bones: mesh_obj.vertex_groups.new(name=b_name)
-                for i, w in enumerate(weights):
-                    bi1, bw1, bi2, bw2 = w
-                    if bw1 > 0.001 and bi1 < len(bones): mesh_obj.vertex_groups[bones[bi1]].add([i], bw1, 'REPLACE')
-                    if bw2 > 0.001 and bi2 < len(bones): mesh_obj.vertex_groups[bones[bi2]].add([i], bw2, 'ADD')
+                assign_vertex_weights(mesh_obj, bones, weights)
                 
                 if armature_obj:
                     modifier = mesh_obj.modifiers.new(name='Armature', type='ARMATURE')
@@ -298,72 +445,78 @@ class SRO_OT_ImportUI(Operator):
             print("[LOG] Anyag létrehozása...")
             mat_props = bmt_data.get(mat_name_from_bms)
             final_mat_name = (mat_props.get('name') if mat_props else mat_name_from_bms) or "Material"
-            mat = bpy.data.materials.new(name=final_mat_name)
-            mat.use_nodes = True
-            mesh_obj.data.materials.append(mat)
-            
-            nodes, links = mat.node_tree.nodes, mat.node_tree.links
-            bsdf = nodes.get("Principled BSDF")
-            if not bsdf:
-                bsdf = nodes.new("ShaderNodeBsdfPrincipled")
-                output = nodes.new("ShaderNodeOutputMaterial")
-                links.new(bsdf.outputs['BSDF'], output.inputs['Surface'])
 
             bms_dir = os.path.dirname(bms_path)
             bmt_dir = os.path.dirname(bmt_path) if bmt_path else ""
             
+            # Kisbetűs fájlnév -> útvonal a BMT, majd a BMS mappából; a BMT mappa találata élvez elsőbbséget.
+            tex_index = {}
+            for d in (bmt_dir, bms_dir):
+                if d:
+                    for name, path in scan_directory(d).items(): tex_index.setdefault(name, path)
+
             def find_texture(texture_name, default_path):
                 if not texture_name: return default_path
-                candidate = os.path.join(bmt_dir, texture_name)
-                if os.path.exists(candidate): return candidate
-                candidate_bms = os.path.join(bms_dir, texture_name)
-                if os.path.exists(candidate_bms): return candidate_bms
+                if any(sep in texture_name for sep in ('/', '\\')):
+                    # Almappát is tartalmazó név: ezt nem fedi le az index, a régi módon keressük.
+                    for d in (bmt_dir, bms_dir):
+                        candidate = os.path.join(d, texture_name)
+                        if os.path.exists(candidate): return candidate
+                else:
+                    candidate = tex_index.get(texture_name.lower())
+                    if candidate: return candidate
                 print(f"   [FIGYELEM] A '{texture_name}' textúra nem található a BMT/BMS mappában.")
                 return default_path
 
-            def process_texture(texture_path, texture_type="Diffuse"):
+            def process_texture(texture_path, texture_type="Diffuse", colorspace='sRGB'):
                 if not texture_path or not os.path.exists(texture_path) or not texture_path.lower().endswith('.ddj'):
                     return None
                 
                 print(f" [LOG] {texture_type} textúra feldolgozása: {os.path.basename(texture_path)}")
                 try:
-                    png_path = convert_ddj_to_png(texture_path)
-                    print(f"   -> Sikeresen konvertálva ide: {png_path}")
-                    return png_path
+                    image = load_ddj_image(texture_path, colorspace, props.pack_textures)
+                    if image: print(f"   -> Kép betöltve a Blenderbe: {image.name}")
+                    return image
                 except Exception as e:
                     print(f" [HIBA] A(z) {texture_type} textúra konvertálása sikertelen: {e}")
                     return None
 
+            # Először a képeket oldjuk fel, így a node fát egy lépésben, üres fáról építhetjük fel.
             diffuse_tex_name = mat_props.get('texture') if mat_props else None
-            diffuse_path = find_texture(diffuse_tex_name, texture_path_default)
-            png_path_diffuse = process_texture(diffuse_path, "Diffuse")
+            diffuse_image = process_texture(find_texture(diffuse_tex_name, texture_path_default), "Diffuse")
+            normal_tex_name = mat_props.get('normal_map') if mat_props else None
+            normal_image = process_texture(find_texture(normal_tex_name, ""), "Normal Map", 'Non-Color') if normal_tex_name else None
+
+            mat = bpy.data.materials.new(name=final_mat_name)
+            mat.use_nodes = True
+            mesh_obj.data.materials.append(mat)
             
-            if png_path_diffuse:
-                tex_node = nodes.new("ShaderNodeTexImage")
-                tex_node.image = bpy.data.images.load(png_path_diffuse)
-                print(f"   -> Kép betöltve a Blenderbe: {os.path.basename(png_path_diffuse)}")
-                
-                mat.node_tree.nodes.active = tex_node
-                
-                links.new(bsdf.inputs['Base Color'], tex_node.outputs['Color'])
+            nodes, links = mat.node_tree.nodes, mat.node_tree.links
+            nodes.clear()
+            bsdf = nodes.new("ShaderNodeBsdfPrincipled"); bsdf.location = (0, 0)
+            output = nodes.new("ShaderNodeOutputMaterial"); output.location = (300, 0)
+            node_links = [(bsdf.outputs['BSDF'], output.inputs['Surface'])]
+
+            if diffuse_image:
+                tex_node = nodes.new("ShaderNodeTexImage"); tex_node.location = (-400, 200)
+                tex_node.image = diffuse_image
+                nodes.active = tex_node
+                node_links.append((tex_node.outputs['Color'], bsdf.inputs['Base Color']))
                 if mat_props and mat_props['flags'] & 0x200:
                     mat.blend_method = 'BLEND'
                     if hasattr(mat, "eevee"):
                         mat.eevee.shadow_method = 'HASHED'
-                print(f"   -> Diffuse textúra sikeresen hozzárendelve a shaderhez.")
 
-            normal_tex_name = mat_props.get('normal_map') if mat_props else None
-            if normal_tex_name:
-                normal_path = find_texture(normal_tex_name, "")
-                png_path_normal = process_texture(normal_path, "Normal Map")
-                if png_path_normal:
-                    norm_tex_node = nodes.new("ShaderNodeTexImage")
-                    norm_tex_node.image = bpy.data.images.load(png_path_normal)
-                    norm_tex_node.image.colorspace_settings.name = 'Non-Color'
-                    norm_map_node = nodes.new("ShaderNodeNormalMap")
-                    links.new(norm_tex_node.outputs['Color'], norm_map_node.inputs['Color'])
-                    links.new(norm_map_node.outputs['Normal'], bsdf.inputs['Normal'])
-                    print(f"   -> Normal Map sikeresen hozzárendelve a shaderhez.")
+            if normal_image:
+                norm_tex_node = nodes.new("ShaderNodeTexImage"); norm_tex_node.location = (-600, -200)
+                norm_tex_node.image = normal_image
+                norm_map_node = nodes.new("ShaderNodeNormalMap"); norm_map_node.location = (-300, -200)
+                node_links.append((norm_tex_node.outputs['Color'], norm_map_node.inputs['Color']))
+                node_links.append((norm_map_node.outputs['Normal'], bsdf.inputs['Normal']))
+
+            for from_socket, to_socket in node_links: links.new(from_socket, to_socket)
+            if diffuse_image: print(f"   -> Diffuse textúra sikeresen hozzárendelve a shaderhez.")
+            if normal_image: print(f"   -> Normal Map sikeresen hozzárendelve a shaderhez.")
 
             if mat_props:
                 bsdf.inputs['Base Color'].default_value = mat_props['diffuse']
@@ -390,12 +543,12 @@ class VIEW3D_PT_sro_panel(Panel):
         box.prop(props, "import_bsk_filepath")
         box.prop(props, "import_bmt_filepath")
         box.prop(props, "import_texture_filepath", text=".DDJ File")
+        box.prop(props, "pack_textures")
         box.operator(SRO_OT_ImportUI.bl_idname)
 
 # --- Regisztráció ---
 classes = (SROProperties, SRO_OT_ImportUI, VIEW3D_PT_sro_panel)
 def register():
-    if not PILLOW_OK: print("WARNING: 'Pillow' Python library not installed. DDJ textures cannot be loaded.")
     for cls in classes: bpy.utils.register_class(cls)
     bpy.types.Scene.sro_props = PointerProperty(type=SROProperties)
 def unregister():
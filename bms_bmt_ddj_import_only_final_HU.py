@@ -10,11 +10,13 @@ bl_info = {
 
 import bpy
 import os
-import bmesh
 import struct
 import tempfile
+import hashlib
 import io
 import math
+import mmap
+import numpy as np
 
 try:
     from PIL import Image
@@ -26,11 +28,12 @@ from bpy.props import StringProperty, PointerProperty, BoolProperty
 from bpy.types import Operator, Panel, PropertyGroup
 
 # --- Segédfüggvények ---
-def read_int(f): return int.from_bytes(f.read(4), 'little')
-def read_short(f): return int.from_bytes(f.read(2), 'little')
-def read_byte(f): return int.from_bytes(f.read(1), 'little')
-def read_float(f): return struct.unpack('<f', f.read(4))[0]
-def read_color4(f): return struct.unpack('<4f', f.read(16))
+# Előre lefordított Struct-ok, hogy az olvasók ne értelmezzék újra a formátumot minden hívásnál.
+_S_I = struct.Struct('<I'); _S_F = struct.Struct('<f'); _S_4F = struct.Struct('<4f'); _S_15I = struct.Struct('<15I')
+
+def read_int(f): return _S_I.unpack(f.read(4))[0]
+def read_float(f): return _S_F.unpack(f.read(4))[0]
+def read_color4(f): return _S_4F.unpack(f.read(16))
 def read_str(f):
     str_len = read_int(f);
     if str_len <= 0: return ""
@@ -39,25 +42,84 @@ def read_str(f):
     except UnicodeDecodeError: return str_bytes.decode("utf-8", errors='ignore')
 def name_exists(name): return name in bpy.data.objects
 
+# BMS vertex rekord: pozíció, normál (kihagyva), UV, 12 bájt kihagyva.
+BMS_VERTEX_DTYPE = np.dtype([('pos', '<3f4'), ('normal', 'V12'), ('uv', '<2f4'), ('tail', 'V12')])
+# Súlyozási rekord: (csont index, súly * 10000, csont index, súly * 10000), igazítás nélkül 6 bájt.
+BMS_SKIN_DTYPE = np.dtype([('bi1', 'u1'), ('bw1', '<u2'), ('bi2', 'u1'), ('bw2', '<u2')])
+
+def assign_vertex_weights(obj, bones, skin):
+    # Vertexek csoportosítása (csont, nyers súly) párok szerint: páronként egyetlen add() hívás.
+    # Az első befolyás REPLACE, a második ADD módban kerül fel, ahogy a vertexenkénti változatban.
+    groups = [obj.vertex_groups[b_name] for b_name in bones]
+    for bone_idx, bone_w, mode in ((skin['bi1'], skin['bw1'], 'REPLACE'), (skin['bi2'], skin['bw2'], 'ADD')):
+        sel = np.flatnonzero((bone_w > 0) & (bone_idx < len(bones)))
+        if not len(sel): continue
+        order = sel[np.lexsort((bone_w[sel], bone_idx[sel]))]
+        keys_b, keys_w = bone_idx[order], bone_w[order]
+        starts = np.flatnonzero(np.r_[True, (keys_b[1:] != keys_b[:-1]) | (keys_w[1:] != keys_w[:-1])])
+        for chunk, bi, w in zip(np.split(order, starts[1:]), keys_b[starts].tolist(), keys_w[starts].tolist()):
+            groups[bi].add(chunk.tolist(), w / 10000.0, mode)
+
 # --- Képfeldolgozás ---
+# (DDJ útvonal, módosítási idő) -> a DDJ tartalmának hash-e az aktuális Blender munkamenetben.
+ddj_digest_cache = {}
+
+def ddj_digest(ddj_path):
+    # A cache fájlok nevét a DDJ tartalmának hash-éből képezzük (mint a bsk-s importerben), így a különböző
+    # mappákban lévő, azonos nevű textúrák nem ütköznek.
+    cache_key = (os.path.abspath(ddj_path), os.stat(ddj_path).st_mtime_ns)
+    digest = ddj_digest_cache.get(cache_key)
+    if digest is None:
+        with open(ddj_path, 'rb') as f: digest = hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+        ddj_digest_cache[cache_key] = digest
+    return digest
+
 def convert_ddj_to_png(ddj_path):
     if not PILLOW_OK: raise ImportError("A Pillow (PIL) könyvtár szükséges.")
     try:
+        temp_png_path = os.path.join(tempfile.gettempdir(), f"sro_{ddj_digest(ddj_path)}.png")
+        if os.path.exists(temp_png_path): return temp_png_path
         with open(ddj_path, 'rb') as f:
             f.seek(20); dds_data = f.read()
         image = Image.open(io.BytesIO(dds_data))
-        temp_png_path = os.path.join(tempfile.gettempdir(), os.path.basename(ddj_path) + ".png")
-        image.save(temp_png_path, 'PNG')
+        image.save(temp_png_path + ".part", 'PNG')
+        os.replace(temp_png_path + ".part", temp_png_path)
         return temp_png_path
     except Exception as e:
         print(f"DDJ -> PNG konverziós hiba: {e}"); return None
 
+def extract_ddj_to_dds(ddj_path):
+    # A DDJ egy 20 bájtos fejléc + DDS adat; a DDS részt külön fájlba írjuk, amit a Blender natívan be tud tölteni.
+    dds_path = os.path.join(tempfile.gettempdir(), f"sro_{ddj_digest(ddj_path)}.dds")
+    if os.path.exists(dds_path): return dds_path
+    with open(ddj_path, 'rb') as f:
+        f.seek(20); dds_data = f.read()
+    with open(dds_path + ".part", 'wb') as out: out.write(dds_data)
+    os.replace(dds_path + ".part", dds_path)
+    return dds_path
+
+def load_ddj_image(ddj_path):
+    # Elsőként natív DDS betöltés (nincs Pillow dekódolás és PNG kódolás); ha a Blender nem tudja
+    # dekódolni, a Pillow-s PNG konverzióra esünk vissza.
+    try:
+        image = bpy.data.images.load(extract_ddj_to_dds(ddj_path), check_existing=True)
+        if image.size[0] > 0: return image
+        bpy.data.images.remove(image)
+        print("  [LOG] A Blender nem tudta betölteni a DDS-t, PNG konverzió következik.")
+    except (OSError, RuntimeError) as e:
+        print(f"  [LOG] DDS betöltés sikertelen ({e}), PNG konverzió következik.")
+    if not PILLOW_OK:
+        print("  [HIBA] A PNG konverzióhoz a Pillow (PIL) könyvtár szükséges."); return None
+    png_path = convert_ddj_to_png(ddj_path)
+    return bpy.data.images.load(png_path, check_existing=True) if png_path else None
+
 # --- BMT Fájl Értelmező ---
 def read_bmt_file(bmt_filepath):
     if not bmt_filepath or not os.path.exists(bmt_filepath): return {}
     materials = {}
     try:
-        with open(bmt_filepath, 'rb') as f:
+        # Az mmap fájlszerű read/seek felülete miatt az olvasók változatlanok, de rendszerhívás nélkül olvasnak.
+        with open(bmt_filepath, 'rb') as bmt_file, mmap.mmap(bmt_file.fileno(), 0, access=mmap.ACCESS_READ) as f:
             if b"JMXVBMT" not in f.read(12): return {}
             count = read_int(f)
             for _ in range(count):
@@ -88,7 +150,6 @@ class SRO_OT_ImportUI(Operator):
 
     def execute(self, context):
         print(f"\n--- Új Importálási Folyamat Indul (v{bl_info['version'][0]}.{bl_info['version'][1]}.{bl_info['version'][2]}) ---")
-        if not PILLOW_OK: self.report({'ERROR'}, "Pillow könyvtár hiányzik!"); return {'CANCELLED'}
         props = context.scene.sro_props
         bms_path, bmt_path, ddj_path = props.import_bms_filepath, props.import_bmt_filepath, props.import_ddj_filepath
 
@@ -101,27 +162,27 @@ class SRO_OT_ImportUI(Operator):
             mesh_name_from_bms, mat_name_from_bms = "", ""
 
             print(f"[LOG] BMS fájl megnyitása: {os.path.basename(bms_path)}")
-            with open(bms_path, 'rb') as f:
+            with open(bms_path, 'rb') as bms_file, mmap.mmap(bms_file.fileno(), 0, access=mmap.ACCESS_READ) as f:
                 if b"JMXVBMS" not in f.read(12): raise ValueError("Nem érvényes BMS fájl.")
-                p_verticies, p_bones, p_faces = read_int(f), read_int(f), read_int(f)
-                for _ in range(7): read_int(f)
-                for _ in range(5): read_int(f)
+                # A fejléc 15 uint32 mezője egy lépésben; ebből csak az első három offsetet használjuk.
+                p_verticies, p_bones, p_faces = _S_15I.unpack(f.read(_S_15I.size))[:3]
                 mesh_name_from_bms, mat_name_from_bms = read_str(f), read_str(f)
                 
                 f.seek(p_verticies); vcount = read_int(f)
                 print(f"  [LOG] {vcount} vertex beolvasása...")
-                for _ in range(vcount):
-                    verts.append((read_float(f), -read_float(f), read_float(f)))
-                    f.seek(12, 1); u, v = read_float(f), read_float(f); uvs.append((u, 1.0 - v)); f.seek(12, 1)
+                # A teljes vertex blokk egyetlen olvasással és np.frombuffer-rel; Y és V tükrözés tömbszinten.
+                vertex_data = np.frombuffer(f.read(vcount * BMS_VERTEX_DTYPE.itemsize), dtype=BMS_VERTEX_DTYPE, count=vcount)
+                verts = vertex_data['pos'].copy(); verts[:, 1] = -verts[:, 1]
+                uvs = vertex_data['uv'].copy(); uvs[:, 1] = 1.0 - uvs[:, 1]
                 f.seek(p_faces); fcount = read_int(f)
                 print(f"  [LOG] {fcount} lap (face) beolvasása...")
-                faces = [tuple(read_short(f) for _ in range(3)) for _ in range(fcount)]
+                faces = np.frombuffer(f.read(fcount * 6), dtype='<u2', count=fcount * 3).reshape(fcount, 3)
                 if p_bones > 0:
                     f.seek(p_bones); bcount = read_int(f)
                     if bcount > 0:
                         print(f"  [LOG] {bcount} csont (bone) és súlyozás beolvasása...")
                         bones = [read_str(f) for _ in range(bcount)]
-                        weights = [(read_byte(f), read_short(f), read_byte(f), read_short(f)) for _ in range(vcount)]
+                        weights = np.frombuffer(f.read(vcount * BMS_SKIN_DTYPE.itemsize), dtype=BMS_SKIN_DTYPE, count=vcount)
             print("[LOG] BMS adatok sikeresen a memóriába olvasva.")
             
             print("[LOG] Blender objektum létrehozása...")
@@ -129,20 +190,17 @@ class SRO_OT_ImportUI(Operator):
             mesh = bpy.data.meshes.new(obj_name + '_Mesh')
             obj = bpy.data.objects.new(obj_name, mesh)
             context.collection.objects.link(obj); context.view_layer.objects.active = obj
-            mesh.from_pydata(verts, [], faces); mesh.update()
+            mesh.from_pydata(verts.tolist(), [], faces.tolist()); mesh.update()
             
-            bm = bmesh.new(); bm.from_mesh(mesh)
-            uv_layer = bm.loops.layers.uv.new("UVMap")
-            for face in bm.faces:
-                for loop in face.loops: loop[uv_layer].uv = uvs[loop.vert.index]
-            bm.to_mesh(mesh); bm.free()
+            # Loop-onkénti UV a loopok vertex indexei alapján, egyetlen foreach_set hívással (BMesh nélkül).
+            loop_vert_indices = np.empty(len(mesh.loops), dtype=np.int32)
+            mesh.loops.foreach_get("vertex_index", loop_vert_indices)
+            uv_layer = mesh.uv_layers.new(name="UVMap")
+            uv_layer.data.foreach_set("uv", uvs[loop_vert_indices].ravel())
             if bones:
                 print(f"  [LOG] Vertex csoportok létrehozása: {bones}")
                 for b_name in bones: obj.vertex_groups.new(name=b_name)
-                for i, w in enumerate(weights):
-                    bi1, bw1, bi2, bw2 = w
-                    if bw1 > 0 and bi1 < len(bones): obj.vertex_groups[bones[bi1]].add([i], bw1 / 10000.0, 'REPLACE')
-                    if bw2 > 0 and bi2 < len(bones): obj.vertex_groups[bones[bi2]].add([i], bw2 / 10000.0, 'ADD')
+                assign_vertex_weights(obj, bones, weights)
             print("[LOG] Geometria és súlyozás kész.")
 
             print("[LOG] Anyag létrehozása...")
@@ -163,11 +221,11 @@ class SRO_OT_ImportUI(Operator):
                 if os.path.exists(path_from_bmt): final_ddj_path = path_from_bmt
             
             if final_ddj_path and os.path.exists(final_ddj_path):
-                png_path = convert_ddj_to_png(final_ddj_path)
-                if png_path and os.path.exists(png_path):
+                texture_image = load_ddj_image(final_ddj_path)
+                if texture_image:
                     print(f"  [LOG] Textúra node-ok létrehozása...")
                     tex_node = nodes.new("ShaderNodeTexImage")
-                    tex_node.image = bpy.data.images.load(png_path)
+                    tex_node.image = texture_image
                     tex_node.interpolation = 'Closest'
                     uv_map_node = nodes.new(type='ShaderNodeUVMap'); uv_map_node.uv_map = "UVMap"
                     mapping_node = nodes.new(type='ShaderNodeMapping')
@@ -208,7 +266,7 @@ class VIEW3D_PT_sro_panel(Panel):
 # --- Regisztráció ---
 classes = (SROProperties, SRO_OT_ImportUI, VIEW3D_PT_sro_panel)
 def register():
-    if not PILLOW_OK: print("FIGYELEM: A 'Pillow' Python könyvtár nincs telepítve.")
+    if not PILLOW_OK: print("FIGYELEM: A 'Pillow' Python könyvtár nincs telepítve; csak a natív DDS betöltés érhető el.")
     for cls in classes: bpy.utils.register_class(cls)
     bpy.types.Scene.sro_props = PointerProperty(type=SROProperties)
 def unregister():
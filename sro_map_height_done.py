@@ -8,7 +8,10 @@ bl_info = {
     "category": "Import-Export",
 }
 
-import bpy, os, struct, time, re, math
+import bpy, os, struct, time, math, functools
+import numpy as np
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from bpy.types import Operator, Panel, PropertyGroup
 from bpy.props import StringProperty, BoolProperty, FloatProperty, PointerProperty, EnumProperty
 
@@ -16,11 +19,17 @@ PARSED_REGIONS = []
 NAMED_REGIONS_DATA = {}
 REGION_ORIENT  = "XZ"
 MFO_HEADER     = (0, 0)
+MAPM_CACHE_SIZE = 256   # regions kept in the height cache (~37 KB each)
 
 REGION_SIZE = 1920.0
 VERTS_PER_AXIS = 97
 TILE_UNIT = REGION_SIZE / (VERTS_PER_AXIS - 1)
 
+# JMXVMAPM block: header, 17x17 vertices (height, 2+1 bytes unused), flags, 16x16 tile ids, trailer.
+MAPM_VERTEX_DTYPE = np.dtype([('h', '<f4'), ('pad', 'V3')])
+MAPM_BLOCK_DTYPE  = np.dtype([('head', 'V6'), ('verts', MAPM_VERTEX_DTYPE, (17, 17)), ('flags', 'V6'),
+                              ('tiles', 'V512'), ('tail', 'V28')])
+
 def _print_install_header():
     print("\n"*5, end=""); time.sleep(0.2)
     v = bl_info.get("version", (0,0,0))
@@ -46,17 +55,14 @@ def parse_mfo(mfo_path: str):
         f.read(8)
         bitmask = f.read(8192)
         if len(bitmask) != 8192: raise ValueError("RegionData must be 8192 bytes.")
-    regs = []
-    for bi, bv in enumerate(bitmask):
-        if bv == 0: continue
-        for b in range(8):
-            if (bv >> b) & 1:
-                idx = bi*8 + b
-                x = idx & 0xFF
-                z_raw = (idx >> 8) & 0xFF
-                z = z_raw & 0x7F
-                db = 1 if z_raw >= 128 else 0
-                regs.append((x, z, db))
+    # Bit idx (LSB first within each byte) marks region x = idx & 0xFF, z_raw = idx >> 8 (bit 7 = dungeon flag).
+    # The mask is sparse, so only the non-zero 64-bit words are expanded to bits.
+    words = np.frombuffer(bitmask, dtype='<u8')
+    nz = np.flatnonzero(words)
+    rows, cols = np.nonzero(np.unpackbits(words[nz].view(np.uint8).reshape(-1, 8), axis=1, bitorder='little'))
+    idx = nz[rows] * 64 + cols
+    z_raw = (idx >> 8) & 0xFF
+    regs = list(zip((idx & 0xFF).tolist(), (z_raw & 0x7F).tolist(), (z_raw >> 7).tolist()))
     print(f"[INFO] MFO OK: {len(regs)} active regions found.")
     return mw, mh, regs
 
@@ -66,23 +72,22 @@ def parse_regioninfo(regioninfo_path: str):
     if not os.path.isfile(regioninfo_path):
         print(f"[WARN] regioninfo.txt not found at: {regioninfo_path}")
         return
-    cur = None; tmp = {}
+    cur = None; tmp = {}   # area -> set of (x, z) tiles
     with open(regioninfo_path, 'r', encoding='utf-8', errors='ignore') as f:
         for raw in f:
             line = raw.strip()
             if not line: continue
             if line.startswith('#'):
-                parts = re.split(r'\s+', line)
+                parts = line.split(None, 2)
                 if len(parts) > 1:
-                    cur = parts[1]; tmp.setdefault(cur, [])
+                    cur = parts[1]; tmp.setdefault(cur, set())
                 continue
             if cur:
                 try:
-                    xs, zs, *_ = re.split(r'\s+', line)
-                    x, z = int(xs), int(zs)
-                    if (x, z) not in tmp[cur]: tmp[cur].append((x, z))
+                    xs, zs, *_ = line.split(None, 2)
+                    tmp[cur].add((int(xs), int(zs)))
                 except: pass
-    NAMED_REGIONS_DATA = {k: v for k, v in sorted(tmp.items()) if v}
+    NAMED_REGIONS_DATA = {k: sorted(v) for k, v in sorted(tmp.items()) if v}
     print(f"[INFO] Loaded {len(NAMED_REGIONS_DATA)} named areas from regioninfo.txt.")
 
 def find_resource_candidate(map_root: str, a: int, b: int, ext: str):
@@ -102,7 +107,8 @@ def detect_orientation(map_root: str, regions, sample=64) -> str:
     print(f"[INFO] Orientation detected: {mode} (Hits: XZ={hits_xz}, ZX={hits_zx})")
     return mode
 
-def region_center_world(rx: int, rz: int, orient: str):
+def region_center_world(rx, rz, orient: str):
+    # Works on scalars as well as on NumPy arrays of region coordinates.
     gx, gy = (rx, rz) if orient == "XZ" else (rz, rx)
     half = REGION_SIZE * 0.5
     cx = gx*REGION_SIZE + half
@@ -110,51 +116,78 @@ def region_center_world(rx: int, rz: int, orient: str):
     return cx, -cy
 
 def read_mapm_97x97(path_m: str):
+    return _cached_mapm_97x97(path_m, os.stat(path_m).st_mtime_ns)
+
+@functools.lru_cache(maxsize=MAPM_CACHE_SIZE)
+def _cached_mapm_97x97(path_m: str, mtime_ns: int):
+    # Keyed on mtime too, so an edited .m is re-read; lru_cache is thread-safe for the import workers.
+    return _read_mapm_97x97(path_m)
+
+def _read_mapm_97x97(path_m: str):
     with open(path_m, "rb") as f:
         if not f.read(12).startswith(b"JMXVMAPM"): raise ValueError("Not JMXVMAPM.")
-        H = [[0.0 for _ in range(VERTS_PER_AXIS)] for __ in range(VERTS_PER_AXIS)]
-        for zb in range(6):
-            for xb in range(6):
-                f.read(4); f.read(2)
-                for vz in range(17):
-                    for vx in range(17):
-                        h = struct.unpack("<f", f.read(4))[0]
-                        f.read(2); f.read(1)
-                        gx = xb*16 + vx; gz = zb*16 + vz
-                        if gx < VERTS_PER_AXIS and gz < VERTS_PER_AXIS:
-                            H[gz][gx] = h
-                f.read(1+1+4)
-                f.read(16*16*2)
-                f.read(4+4+20)
+        data = f.read(MAPM_BLOCK_DTYPE.itemsize * 36)
+    # 6x6 blocks of 17x17 vertices; neighbouring blocks share their edge row/column and the later block wins.
+    tiles = np.frombuffer(data, dtype=MAPM_BLOCK_DTYPE, count=36)['verts']['h'].reshape(6, 6, 17, 17)
+    H = np.zeros((VERTS_PER_AXIS, VERTS_PER_AXIS), dtype=np.float32)
+    for zb in range(6):
+        for xb in range(6):
+            H[zb*16:zb*16+17, xb*16:xb*16+17] = tiles[zb, xb]
+    H.flags.writeable = False   # shared through the height cache
     return H
 
 def apply_heights(obj, H, height_scale: float):
     me = obj.data
     if len(me.vertices) != VERTS_PER_AXIS * VERTS_PER_AXIS: return
-    coords = [0.0]*(len(me.vertices)*3)
+    coords = np.empty(len(me.vertices)*3, dtype=np.float32)
     me.vertices.foreach_get("co", coords)
-    for i in range(len(me.vertices)):
-        r = i // VERTS_PER_AXIS
-        c = i % VERTS_PER_AXIS
-        coords[i*3+2] = H[r][c] * height_scale
+    # Vertex i is row i // 97, column i % 97, which is exactly H's row-major order.
+    coords.reshape(-1, 3)[:, 2] = np.asarray(H, dtype=np.float32).ravel() * height_scale
     me.vertices.foreach_set("co", coords)
     me.update()
 
-def create_grid_object(name: str, cx: float, cy: float):
-    bpy.ops.mesh.primitive_grid_add(
-        x_subdivisions=VERTS_PER_AXIS-1, y_subdivisions=VERTS_PER_AXIS-1,
-        size=REGION_SIZE, align='WORLD', enter_editmode=False,
-        location=(cx, cy, 0.0)
-    )
-    obj = bpy.context.active_object
-    obj.name = name
+def _build_grid_template():
+    # Same layout as primitive_grid_add: vertex i sits at column i % 97, row i // 97, centred on the origin.
+    n = VERTS_PER_AXIS
+    steps = (np.arange(n, dtype=np.float32) - (n - 1) * 0.5) * TILE_UNIT
+    gx, gy = np.meshgrid(steps, steps)
+    co = np.stack([gx, gy, np.zeros_like(gx)], axis=-1).ravel()
+    v = (np.arange(n - 1)[:, None] * n + np.arange(n - 1)[None, :]).ravel()
+    loop_verts = np.stack([v, v + 1, v + 1 + n, v + n], axis=-1).ravel().astype(np.int32)
+    loop_start = np.arange(0, len(loop_verts), 4, dtype=np.int32)
+    uv = np.stack([loop_verts % n, loop_verts // n], axis=-1).astype(np.float32).ravel() / (n - 1)
+    return co, loop_verts, loop_start, uv
+
+GRID_CO, GRID_LOOP_VERTS, GRID_LOOP_START, GRID_LOOP_UV = _build_grid_template()
+
+def build_grid_mesh(name: str):
+    # Direct mesh construction instead of bpy.ops.mesh.primitive_grid_add (no undo push / selection update).
+    me = bpy.data.meshes.new(name)
+    me.vertices.add(VERTS_PER_AXIS * VERTS_PER_AXIS)
+    me.vertices.foreach_set("co", GRID_CO)
+    me.loops.add(len(GRID_LOOP_VERTS))
+    me.loops.foreach_set("vertex_index", GRID_LOOP_VERTS)
+    me.polygons.add(len(GRID_LOOP_START))
+    me.polygons.foreach_set("loop_start", GRID_LOOP_START)
+    me.uv_layers.new(name="UVMap").data.foreach_set("uv", GRID_LOOP_UV)
+    me.update(calc_edges=True)
+    return me
+
+def create_grid_object(name: str, cx: float, cy: float, template_mesh=None):
+    # Every region shares the same topology, so a prebuilt template is copied instead of rebuilt.
+    if template_mesh is not None:
+        me = template_mesh.copy(); me.name = name
+    else:
+        me = build_grid_mesh(name)
+    obj = bpy.data.objects.new(name, me)
+    obj.location = (cx, cy, 0.0)
     return obj
 
-def ensure_collection(name: str):
+def ensure_collection(name: str, link: bool = True):
     coll = bpy.data.collections.get(name)
     if not coll:
         coll = bpy.data.collections.new(name)
-        bpy.context.scene.collection.children.link(coll)
+        if link: bpy.context.scene.collection.children.link(coll)
     return coll
 
 def link_object_to_collection(obj, coll):
@@ -214,6 +247,15 @@ class SRO_OT_ParseData(Operator):
             return {'CANCELLED'}
         return {'FINISHED'}
 
+class SRO_OT_ClearCache(Operator):
+    bl_idname = "sro.clear_cache"; bl_label = "Clear Height Cache"
+    bl_description = "Forget cached .m height data so the next import re-reads the files"
+
+    def execute(self, context):
+        n = _cached_mapm_97x97.cache_info().currsize; _cached_mapm_97x97.cache_clear()
+        self.report({'INFO'}, f"Cleared {n} cached regions.")
+        return {'FINISHED'}
+
 class SRO_OT_ExecuteImport(Operator):
     bl_idname = "sro.execute_import"; bl_label = "Import Map"
     bl_description = "Import selected named area or full map"
@@ -249,36 +291,64 @@ class SRO_OT_ExecuteImport(Operator):
 
         print(f"\n[INFO] Starting import: mode={p.import_mode}, tiles={len(tiles)}, objZ={z_deg}°")
 
-        coll = ensure_collection(coll_name)
+        # A new collection is filled while it is still outside the scene tree and linked once at the end,
+        # so adding each region does not trigger a view layer resync.
+        coll = ensure_collection(coll_name, link=False)
+        link_coll_at_end = coll.users == 0
         created_objs=[]
         t0=time.time()
 
+        jobs=[]
         for i,(rx,rz) in enumerate(tiles,1):
             a,b = (rx,rz) if REGION_ORIENT=="XZ" else (rz,rx)
             mpath = find_resource_candidate(map_root, a, b, ".m")
             if not mpath:
                 print(f"  [WARN] Missing .m for ({rx},{rz}) - skipping."); continue
-            name=f"Region_{rx:03d}_{rz:03d}"
-            cx,cy = region_center_world(rx,rz,REGION_ORIENT)
-
-            old = bpy.data.objects.get(name)
-            if old:
-                for c in list(old.users_collection):
-                    try: c.objects.unlink(old)
-                    except: pass
-                try: bpy.data.objects.remove(old, do_unlink=True)
-                except: pass
+            jobs.append((i, rx, rz, mpath))
+
+        # .m parsing runs in worker threads; Blender objects may only be created on the main thread,
+        # so results are consumed here in tile order as they become ready.
+        # Objects left over from a previous import of the same regions are removed in one batch.
+        existing = {o.name for o in bpy.data.objects}
+        old_objs = [bpy.data.objects[n] for n in (f"Region_{rx:03d}_{rz:03d}" for (_, rx, rz, _) in jobs) if n in existing]
+        if old_objs:
+            try: bpy.data.batch_remove(ids=old_objs)
+            except Exception as e: print(f"  [WARN] Could not remove previous regions: {e}")
+
+        # World centres for all regions in one vectorised pass; one rotation tuple shared by every object.
+        job_rx = np.array([job[1] for job in jobs], dtype=np.float64)
+        job_rz = np.array([job[2] for job in jobs], dtype=np.float64)
+        centers = zip(*(c.tolist() for c in region_center_world(job_rx, job_rz, REGION_ORIENT)))
+        rotation = (0.0, 0.0, z_rad)
+
+        template_mesh = build_grid_mesh("SRO_Grid_Template")
+        # At most 2x workers reads are in flight, so a Full Map import does not hold every region's heights at once.
+        workers = os.cpu_count() or 1
+        todo = zip(jobs, centers)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for job, center in todo:
+                pending.append((job, center, executor.submit(read_mapm_97x97, job[3])))
+                if len(pending) >= 2 * workers: break
+            while pending:
+                (i, rx, rz, mpath), (cx, cy), future = pending.popleft()
+                nxt = next(todo, None)
+                if nxt: pending.append((nxt[0], nxt[1], executor.submit(read_mapm_97x97, nxt[0][3])))
+                name=f"Region_{rx:03d}_{rz:03d}"
 
-            try:
-                H = read_mapm_97x97(mpath)
-                obj = create_grid_object(name, cx, cy)
-                link_object_to_collection(obj, coll)
-                apply_heights(obj, H, p.height_scale)
-                obj.rotation_euler = (0.0, 0.0, z_rad)
-                created_objs.append(obj)
-                print(f"  [OK] {i:04d}/{len(tiles)}: {name} @ {cx:.1f},{cy:.1f} (Zrot={z_deg}°)")
-            except Exception as e:
-                print(f"  [ERROR] Failed region ({rx},{rz}): {e}")
+                try:
+                    H = future.result()
+                    obj = create_grid_object(name, cx, cy, template_mesh)
+                    link_object_to_collection(obj, coll)
+                    apply_heights(obj, H, p.height_scale)
+                    obj.rotation_euler = rotation
+                    created_objs.append(obj)
+                    print(f"  [OK] {i:04d}/{len(tiles)}: {name} @ {cx:.1f},{cy:.1f} (Zrot={z_deg}°)")
+                except Exception as e:
+                    print(f"  [ERROR] Failed region ({rx},{rz}): {e}")
+        bpy.data.meshes.remove(template_mesh)
+        if link_coll_at_end: context.scene.collection.children.link(coll)
+        context.view_layer.update()
 
         dt=time.time()-t0
         self.report({'INFO'}, f"Completed: {len(created_objs)} tiles in {dt:.2f}s.")
@@ -302,10 +372,11 @@ class SRO_PT_Project(Panel):
                 col.prop(p,"named_region_choice")
             col.separator()
             col.prop(p,"height_scale")
+            col.operator(SRO_OT_ClearCache.bl_idname, icon='TRASH')
             layout.separator()
             layout.operator(SRO_OT_ExecuteImport.bl_idname, icon='PLAY')
 
-CLASSES=(SRO_ProjectProps, SRO_OT_ParseData, SRO_OT_ExecuteImport, SRO_PT_Project)
+CLASSES=(SRO_ProjectProps, SRO_OT_ParseData, SRO_OT_ClearCache, SRO_OT_ExecuteImport, SRO_PT_Project)
 def register():
     for c in CLASSES: bpy.utils.register_class(c)
     bpy.types.Scene.sro_props = PointerProperty(type=SRO_ProjectProps)
@@ -315,5 +386,6 @@ def unregister():
     for c in reversed(CLASSES):
         try: bpy.utils.unregister_class(c)
         except: pass
+    _cached_mapm_97x97.cache_clear()
     print("Silkroad Map – Project UI disabled.")
 if __name__=="__main__": register()
\ No newline at end of file
@@ -8,10 +8,12 @@ bl_info = {
     "category": "Import-Export",
 }
 
-import bpy, os, re, time, math, struct, tempfile, array
+import bpy, os, re, time, math, struct, tempfile, hashlib, mmap, threading
+import numpy as np
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from bpy.types import Operator, Panel, PropertyGroup
 from bpy.props import StringProperty, BoolProperty, FloatProperty, PointerProperty, EnumProperty
-from collections import defaultdict, Counter
 
 REGION_SIZE = 1920.0
 VERTS_PER_AXIS = 97
@@ -21,9 +23,38 @@ PARSED_REGIONS = []
 NAMED_REGIONS_DATA = {}
 REGION_ORIENT = "ZX"
 TERRAIN_DDJ = []
-TEXTURE_CACHE = {}
-MATERIAL_CACHE = {}
+MAX_CACHED_TEXTURES = 512
+MAX_CACHED_MATERIALS = 2048
+
+class LRUCache(OrderedDict):
+    # Bounded dict: reads refresh an entry, inserts past max_size drop the oldest and hand it to on_evict.
+    def __init__(self, max_size, on_evict=None):
+        super().__init__(); self.max_size=max_size; self.on_evict=on_evict
+    def __getitem__(self, key):
+        value=super().__getitem__(key); self.move_to_end(key); return value
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value); self.move_to_end(key)
+        while len(self)>self.max_size:
+            _,old=self.popitem(last=False)
+            if self.on_evict: self.on_evict(old)
+
+def _free_unused(collection_name):
+    # Evicted images/materials are only deleted when nothing in the file uses them any more.
+    def free(id_data):
+        try:
+            if id_data.users==0: getattr(bpy.data, collection_name).remove(id_data)
+        except ReferenceError: pass
+    return free
+
+TEXTURE_CACHE = LRUCache(MAX_CACHED_TEXTURES, _free_unused("images"))
+RES_INDEX = {}
+DDS_PATHS = {}
+MATERIAL_CACHE = LRUCache(MAX_CACHED_MATERIALS, _free_unused("materials"))
 MAX_WARN = 20
+MAPM_CACHE_DIR = os.path.join(tempfile.gettempdir(),"sro_mapm_cache")
+DDJ_CACHE_DIR = os.path.join(tempfile.gettempdir(),"sro_ddj_cache")
 WARN_CNT = 0
 
 def _banner():
@@ -42,28 +73,34 @@ def parse_mfo(mfo_path: str):
         if not f.read(12).startswith(b"JMXVMFO"): raise ValueError("Not JMXVMFO")
         mw,mh = struct.unpack("<HH", f.read(4))
         f.read(8)
-        bits = f.read(8192)
-    regs=[]
-    for i,b in enumerate(bits):
-        if b==0: continue
-        for k in range(8):
-            if (b>>k)&1:
-                idx=i*8+k
-                x = idx & 0xFF
-                zr= (idx>>8)&0xFF
-                z = zr & 0x7F
-                regs.append((x,z,1 if zr>=128 else 0))
+        bits = np.frombuffer(f.read(8192), dtype=np.uint8)
+    # bit idx (LSB first): x = idx & 0xFF, zr = idx >> 8, bit 7 of zr is the dungeon flag
+    idx = np.flatnonzero(np.unpackbits(bits, bitorder='little'))
+    zr = (idx>>8)&0xFF
+    regs = list(zip((idx&0xFF).tolist(), (zr&0x7F).tolist(), (zr>>7).tolist()))
     print(f"[INFO] MFO OK: {len(regs)} active regions found.")
     return regs
 
+def _build_res_index(map_root):
+    # (a, b, ext) -> path, with the same preference order find_res used to probe: plain before zero-padded names.
+    idx={}; rank={}
+    for d in os.scandir(map_root):
+        if not (d.name.isdigit() and d.is_dir()): continue
+        a=int(d.name)
+        if d.name not in (str(a), f"{a:03d}"): continue
+        for f in os.scandir(d.path):
+            name,ext=os.path.splitext(f.name)
+            if not name.isdigit(): continue
+            b=int(name)
+            if name not in (str(b), f"{b:03d}") or not f.is_file(): continue
+            key=(a,b,ext.lower()); r=(d.name!=str(a), name!=str(b))
+            if key not in rank or r<rank[key]: idx[key]=f.path; rank[key]=r
+    return idx
+
 def find_res(map_root, a, b, ext):
-    aS,bS,a3,b3 = str(a),str(b),f"{a:03d}",f"{b:03d}"
-    for p in (os.path.join(map_root,aS,bS+ext),
-              os.path.join(map_root,aS,b3+ext),
-              os.path.join(map_root,a3,bS+ext),
-              os.path.join(map_root,a3,b3+ext)):
-        if os.path.isfile(p): return p
-    return None
+    idx=RES_INDEX.get(map_root)
+    if idx is None: idx=RES_INDEX[map_root]=_build_res_index(map_root)
+    return idx.get((a,b,ext.lower()))
 
 def detect_orient(map_root, regs):
     test = regs[:64] if len(regs)>64 else regs
@@ -78,46 +115,59 @@ def region_center_world(rx,rz,orient):
     half = REGION_SIZE*0.5
     return gx*REGION_SIZE+half, -(gy*REGION_SIZE+half)
 
+# "#<tag> <name>" starts an area, "<x> <z> ..." lines list its tiles.
+_REGIONINFO_RE = re.compile(r'^[ \t]*#\S*[ \t]+(\S+)|^[ \t]*(\d+)[ \t]+(\d+)(?!\S)', re.M)
+
 def parse_regioninfo(path):
-    out={}
-    if not os.path.isfile(path): return out
-    cur=None
-    for line in open(path,'r',encoding='utf-8',errors='ignore'):
-        s=line.strip()
-        if not s: continue
-        if s.startswith('#'):
-            parts=re.split(r'\s+',s)
-            if len(parts)>1: cur=parts[1]; out.setdefault(cur,[])
-            continue
-        if cur:
-            try:
-                xs,zs,*_ = re.split(r'\s+',s)
-                x,z=int(xs),int(zs)
-                if (x,z) not in out[cur]: out[cur].append((x,z))
-            except: pass
-    return {k:v for k,v in out.items() if v}
+    if not os.path.isfile(path): return {}
+    with open(path,'r',encoding='utf-8',errors='ignore') as f: txt=f.read()
+    out={}; cur=None
+    for m in _REGIONINFO_RE.finditer(txt):
+        if m.group(1): cur=out.setdefault(m.group(1),{})
+        elif cur is not None: cur[(int(m.group(2)),int(m.group(3)))]=None
+    return {k:list(v) for k,v in out.items() if v}
+
+# JMXVMAPM block: 6 byte header, 17x17 vertex records, 6 byte flags, 16x16 tile ids, 28 byte trailer.
+MAPM_VERTEX_DTYPE = np.dtype([('h','<f4'),('t','<u2'),('pad','u1')])
+MAPM_BLOCK_DTYPE = np.dtype([('head','V6'),('verts',MAPM_VERTEX_DTYPE,(17,17)),('flags','V6'),('tiles','V512'),('tail','V28')])
+
+def mapm_cache_path(path_m: str):
+    st=os.stat(path_m)
+    key=hashlib.blake2b(os.path.normcase(os.path.abspath(path_m)).encode("utf-8","surrogatepass"), digest_size=8).hexdigest()
+    return os.path.join(MAPM_CACHE_DIR,f"{key}.{st.st_mtime_ns}.{st.st_size}.npz")
 
 def read_mapm_heights_and_tex(path_m: str):
-    H = [[0.0]*VERTS_PER_AXIS for _ in range(VERTS_PER_AXIS)]
-    T = [[0]*VERTS_PER_AXIS for _ in range(VERTS_PER_AXIS)]
-    with open(path_m,"rb") as f:
-        if not f.read(12).startswith(b"JMXVMAPM"): raise ValueError("Not JMXVMAPM")
+    cache_path=mapm_cache_path(path_m)
+    if os.path.isfile(cache_path):
+        try:
+            with np.load(cache_path) as z:
+                H,T=z['H'],z['T']
+            if H.shape==T.shape==(VERTS_PER_AXIS,VERTS_PER_AXIS): return H, T
+        except Exception as e:
+            print(f"    [WARN] Ignoring broken .m cache {cache_path}: {e}")
+    H,T=parse_mapm_heights_and_tex(path_m)
+    try:
+        os.makedirs(os.path.dirname(cache_path),exist_ok=True)
+        with open(cache_path+".part","wb") as w: np.savez(w, H=H, T=T)
+        os.replace(cache_path+".part", cache_path)
+    except OSError as e:
+        print(f"    [WARN] Could not write .m cache {cache_path}: {e}")
+    return H, T
+
+def parse_mapm_heights_and_tex(path_m: str):
+    H = np.empty((VERTS_PER_AXIS,VERTS_PER_AXIS), dtype=np.float32)
+    T = np.empty((VERTS_PER_AXIS,VERTS_PER_AXIS), dtype=np.uint16)
+    with open(path_m,"rb") as f, mmap.mmap(f.fileno(),0,access=mmap.ACCESS_READ) as mm:
+        if not mm[:12].startswith(b"JMXVMAPM"): raise ValueError("Not JMXVMAPM")
+        if len(mm)<12+36*MAPM_BLOCK_DTYPE.itemsize: raise ValueError("Truncated JMXVMAPM")
+        verts=np.frombuffer(mm, dtype=MAPM_BLOCK_DTYPE, count=36, offset=12)['verts'].reshape(6,6,17,17)
+        # Neighbouring blocks share their edge row/column; the later block wins, as in file order.
         for zb in range(6):
             for xb in range(6):
-                f.read(4); f.read(2)
-                for vz in range(17):
-                    for vx in range(17):
-                        h = struct.unpack("<f", f.read(4))[0]
-                        tex = struct.unpack("<H", f.read(2))[0]
-                        f.read(1)
-                        gx = xb*16+vx
-                        gz = zb*16+vz
-                        if gx<VERTS_PER_AXIS and gz<VERTS_PER_AXIS:
-                            H[gz][gx]=h
-                            T[gz][gx]=tex
-                f.read(1+1+4)
-                f.read(16*16*2)
-                f.read(4+4+20)
+                gz,gx = zb*16, xb*16
+                H[gz:gz+17, gx:gx+17] = verts['h'][zb,xb]
+                T[gz:gz+17, gx:gx+17] = verts['t'][zb,xb]
+        del verts
     return H, T
 
 def decode_vertex_tex(vtex:int):
@@ -125,6 +175,9 @@ def decode_vertex_tex(vtex:int):
     scl = (vtex >> 10) & 0x3F
     return tid, scl
 
+_TILE2D_HEADER_RE = re.compile(rb'(?:\s*\S[^\r\n]*){2}')
+_TILE2D_DDJ_RE = re.compile(rb'"([^"\r\n]+\.ddj)"[^\r\n]*', re.IGNORECASE)
+
 def parse_tile2d_ifo(root):
     cands=[
         os.path.join(root,"Data","tile2d.ifo"),
@@ -137,46 +190,80 @@ def parse_tile2d_ifo(root):
     if not path:
         print(f"[WARN] tile2d.ifo not found at: {cands[0]}")
         return []
-    raw=open(path,'rb').read()
-    txt=None
+    with open(path,'rb') as f: raw=f.read()
+    # The first two non-empty lines are the header; after that the first "....ddj" of each line is texture id n.
+    head=_TILE2D_HEADER_RE.match(raw)
+    if not head: return []
+    names=_TILE2D_DDJ_RE.findall(raw, head.end())
+    joined=b"\n".join(names); txt=None
     for enc in ("utf-8","cp949","cp1250","latin-1"):
-        try: txt=raw.decode(enc); break
+        try: txt=joined.decode(enc); break
         except: pass
-    if not txt: return []
-    lines=[l.strip() for l in txt.splitlines() if l.strip()]
-    if len(lines)<3: return []
+    if txt is None: return []
     out=[]
-    for l in lines[2:]:
-        m=re.search(r'"([^"]+\.ddj)"', l, re.IGNORECASE)
-        if m:
-            fn=m.group(1).replace("\\","/")
-            if "/" not in fn: fn="tile2d/"+os.path.basename(fn)
-            out.append(os.path.normpath(fn))
+    for fn in (txt.split("\n") if names else []):
+        fn=fn.replace("\\","/")
+        if "/" not in fn: fn="tile2d/"+os.path.basename(fn)
+        out.append(os.path.normpath(fn))
     print(f"[INFO] Loaded {len(out)} textures from tile2d.ifo.")
     return out
 
+def resolve_ddj_path(map_root: str, rel_path: str):
+    if not rel_path: return None
+    ddj=os.path.join(map_root, rel_path)
+    if os.path.exists(ddj): return ddj
+    cand=os.path.join(map_root,"tile2d", os.path.basename(rel_path))
+    return cand if os.path.exists(cand) else None
+
+def extract_ddj_to_dds(ddj: str):
+    # DDJ = 20 byte header + plain DDS. The cached .dds is named by a hash of the file content,
+    # so equal basenames in different folders never collide and an unchanged texture is written once.
+    # Safe to call from worker threads: no bpy access, and every writer uses its own .part file.
+    st=os.stat(ddj)
+    key=(os.path.normcase(ddj), st.st_mtime_ns, st.st_size)
+    temp=DDS_PATHS.get(key)
+    if temp and os.path.exists(temp): return temp
+    if st.st_size<64: return None
+    with open(ddj,"rb") as f, mmap.mmap(f.fileno(),0,access=mmap.ACCESS_READ) as mm:
+        digest=hashlib.blake2b(mm, digest_size=8).hexdigest()
+        temp=os.path.join(DDJ_CACHE_DIR,f"{digest}.dds")
+        if not os.path.exists(temp):
+            os.makedirs(DDJ_CACHE_DIR,exist_ok=True)
+            part=f"{temp}.{os.getpid()}.{threading.get_ident()}.part"
+            with open(part,"wb") as w: w.write(mm[20:])
+            os.replace(part, temp)
+    DDS_PATHS[key]=temp
+    return temp
+
+def prefetch_region_textures(map_root: str, T):
+    # Worker-thread half of texture loading: extract every DDJ the region references so the main thread
+    # only has to call bpy.data.images.load on files that are already on disk.
+    tids,_=decode_vertex_tex(np.unique(T))
+    for tid in np.unique(tids).tolist():
+        ddj=resolve_ddj_path(map_root, TERRAIN_DDJ[tid]) if tid<len(TERRAIN_DDJ) else None
+        if not ddj: continue
+        try: extract_ddj_to_dds(ddj)
+        except OSError: pass
+
+def load_region_data(path_m: str, map_root: str, textures: bool):
+    H,T=read_mapm_heights_and_tex(path_m)
+    if textures: prefetch_region_textures(map_root, T)
+    return H, T
+
 def load_ddj_image(map_root: str, rel_path: str):
     global WARN_CNT
     if not rel_path: return None
-    ddj=os.path.join(map_root, rel_path)
-    if not os.path.exists(ddj):
-        cand=os.path.join(map_root,"tile2d", os.path.basename(rel_path))
-        if os.path.exists(cand): ddj=cand
-        else:
-            if WARN_CNT<MAX_WARN:
-                print(f"    [WARN] Texture not found: {rel_path}")
-                WARN_CNT+=1
-            return None
+    ddj=resolve_ddj_path(map_root, rel_path)
+    if not ddj:
+        if WARN_CNT<MAX_WARN:
+            print(f"    [WARN] Texture not found: {rel_path}")
+            WARN_CNT+=1
+        return None
     key=os.path.normcase(ddj)
     if key in TEXTURE_CACHE: return TEXTURE_CACHE[key]
     try:
-        data=open(ddj,"rb").read()
-        if len(data)<64: return None
-        dds=data[20:]
-        cache=os.path.join(tempfile.gettempdir(),"sro_ddj_cache"); os.makedirs(cache,exist_ok=True)
-        temp=os.path.join(cache,f"{os.path.basename(ddj)}.{int(os.path.getmtime(ddj))}.dds")
-        if not os.path.exists(temp):
-            with open(temp,"wb") as w: w.write(dds)
+        temp=extract_ddj_to_dds(ddj)
+        if not temp: return None
         img=bpy.data.images.load(temp, check_existing=True)
         TEXTURE_CACHE[key]=img
         return img
@@ -184,30 +271,95 @@ def load_ddj_image(map_root: str, rel_path: str):
         print(f"    [ERROR] DDJ load failed: {ddj} :: {e}")
         return None
 
-def ensure_collection(name: str):
+def ensure_collection(name: str, link: bool=True):
     coll=bpy.data.collections.get(name)
     if not coll:
         coll=bpy.data.collections.new(name)
-        bpy.context.scene.collection.children.link(coll)
+        if link: bpy.context.scene.collection.children.link(coll)
     return coll
 
-def create_grid_object(name: str, cx: float, cy: float):
-    bpy.ops.mesh.primitive_grid_add(x_subdivisions=VERTS_PER_AXIS-1, y_subdivisions=VERTS_PER_AXIS-1, size=REGION_SIZE, align='WORLD', enter_editmode=False, location=(cx, cy, 0.0))
-    obj=bpy.context.active_object
-    obj.name=name
+def _build_grid_template():
+    # Same layout as primitive_grid_add: vertex i sits at column i%97, row i//97, centred on the origin.
+    n=VERTS_PER_AXIS
+    steps=(np.arange(n, dtype=np.float32)-(n-1)*0.5)*(REGION_SIZE/(n-1))
+    gx,gy=np.meshgrid(steps, steps)
+    co=np.stack([gx, gy, np.zeros_like(gx)], axis=-1).ravel()
+    v=(np.arange(n-1)[:,None]*n+np.arange(n-1)[None,:]).ravel()
+    loop_verts=np.stack([v, v+1, v+1+n, v+n], axis=-1).ravel().astype(np.int32)
+    loop_start=np.arange(0, len(loop_verts), 4, dtype=np.int32)
+    uv=np.stack([loop_verts%n, loop_verts//n], axis=-1).astype(np.float32).ravel()/(n-1)
+    return co, loop_verts, loop_start, uv
+
+GRID_CO, GRID_LOOP_VERTS, GRID_LOOP_START, GRID_LOOP_UV = _build_grid_template()
+GRID_QUAD_VERTS = GRID_LOOP_VERTS.reshape(-1,4)
+
+def build_grid_mesh(name: str):
+    me=bpy.data.meshes.new(name)
+    me.vertices.add(VERTS_PER_AXIS*VERTS_PER_AXIS); me.vertices.foreach_set("co", GRID_CO)
+    me.loops.add(len(GRID_LOOP_VERTS)); me.loops.foreach_set("vertex_index", GRID_LOOP_VERTS)
+    me.polygons.add(len(GRID_LOOP_START)); me.polygons.foreach_set("loop_start", GRID_LOOP_START)
+    me.uv_layers.new(name="UVMap").data.foreach_set("uv", GRID_LOOP_UV)
+    me.update(calc_edges=True)
+    return me
+
+def create_grid_object(name: str, cx: float, cy: float, template_mesh=None):
+    if template_mesh is not None:
+        me=template_mesh.copy(); me.name=name
+    else:
+        me=build_grid_mesh(name)
+    obj=bpy.data.objects.new(name, me)
+    obj.location=(cx, cy, 0.0)
     return obj
 
 def apply_heights(obj, H, scale):
     me=obj.data
-    if len(me.vertices)!=VERTS_PER_AXIS*VERTS_PER_AXIS: return
-    coords=array.array('f',[0.0]*(len(me.vertices)*3))
+    n=len(me.vertices)
+    if n!=VERTS_PER_AXIS*VERTS_PER_AXIS: return
+    coords=np.empty(n*3, dtype=np.float32)
     me.vertices.foreach_get("co", coords)
-    for i in range(len(me.vertices)):
-        r=i//VERTS_PER_AXIS
-        c=i%VERTS_PER_AXIS
-        coords[i*3+2]=H[r][c]*scale
+    coords[2::3]=H.ravel()*scale
     me.vertices.foreach_set("co", coords)
-    me.update()
+
+def terrain_uv_group():
+    # Shared TexCoord -> Mapping scaffold: UV tiled TEXTURE_TILING_FACTOR times per region.
+    ng=bpy.data.node_groups.get("SRO_TerrainUV")
+    if ng: return ng
+    ng=bpy.data.node_groups.new("SRO_TerrainUV","ShaderNodeTree")
+    ng.interface.new_socket(name="Vector", in_out='OUTPUT', socket_type='NodeSocketVector')
+    nodes=ng.nodes; links=ng.links
+    texcoord=nodes.new("ShaderNodeTexCoord"); texcoord.location=(-400,0)
+    mapping=nodes.new("ShaderNodeMapping"); mapping.location=(-200,0)
+    mapping.inputs['Scale'].default_value=(TEXTURE_TILING_FACTOR,TEXTURE_TILING_FACTOR,1.0)
+    gout=nodes.new("NodeGroupOutput"); gout.location=(0,0)
+    links.new(texcoord.outputs['UV'], mapping.inputs['Vector'])
+    links.new(mapping.outputs['Vector'], gout.inputs["Vector"])
+    return ng
+
+def terrain_shader_group():
+    # Shared Mix(Base, Layer, Fac) -> Principled scaffold; with Layer/Fac unlinked it shades Base only.
+    ng=bpy.data.node_groups.get("SRO_TerrainShader")
+    if ng: return ng
+    ng=bpy.data.node_groups.new("SRO_TerrainShader","ShaderNodeTree")
+    ng.interface.new_socket(name="Base", in_out='INPUT', socket_type='NodeSocketColor')
+    ng.interface.new_socket(name="Layer", in_out='INPUT', socket_type='NodeSocketColor')
+    fac=ng.interface.new_socket(name="Fac", in_out='INPUT', socket_type='NodeSocketFloat')
+    fac.default_value=0.0; fac.min_value=0.0; fac.max_value=1.0
+    ng.interface.new_socket(name="BSDF", in_out='OUTPUT', socket_type='NodeSocketShader')
+    nodes=ng.nodes; links=ng.links
+    gin=nodes.new("NodeGroupInput"); gin.location=(-500,0)
+    mix=nodes.new("ShaderNodeMixRGB"); mix.location=(-250,0); mix.blend_type='MIX'
+    bsdf=nodes.new("ShaderNodeBsdfPrincipled"); bsdf.location=(0,0)
+    sp=bsdf.inputs.get("Specular") or bsdf.inputs.get("Specular IOR Level")
+    if sp: sp.default_value=0.0
+    ro=bsdf.inputs.get("Roughness")
+    if ro: ro.default_value=0.85
+    gout=nodes.new("NodeGroupOutput"); gout.location=(300,0)
+    links.new(gin.outputs["Base"], mix.inputs['Color1'])
+    links.new(gin.outputs["Layer"], mix.inputs['Color2'])
+    links.new(gin.outputs["Fac"], mix.inputs['Fac'])
+    links.new(mix.outputs['Color'], bsdf.inputs['Base Color'])
+    links.new(bsdf.outputs["BSDF"], gout.inputs["BSDF"])
+    return ng
 
 def get_pair_material(map_root, base_tid, layer_tid):
     a=min(base_tid, layer_tid)
@@ -226,63 +378,59 @@ def get_pair_material(map_root, base_tid, layer_tid):
     mat=bpy.data.materials.new(mat_name); mat.use_nodes=True
     nt=mat.node_tree; nodes=nt.nodes; links=nt.links
     for n in list(nodes): nodes.remove(n)
-    out=nodes.new("ShaderNodeOutputMaterial"); out.location=(900,0)
-    bsdf=nodes.new("ShaderNodeBsdfPrincipled"); bsdf.location=(700,0)
-    sp=bsdf.inputs.get("Specular") or bsdf.inputs.get("Specular IOR Level")
-    if sp: sp.default_value=0.0
-    ro=bsdf.inputs.get("Roughness"); 
-    if ro: ro.default_value=0.85
-    links.new(bsdf.outputs["BSDF"], out.inputs["Surface"])
-    texcoord=nodes.new("ShaderNodeTexCoord"); texcoord.location=(-900,0)
-    mapping =nodes.new("ShaderNodeMapping"); mapping.location=(-700,0)
-    mapping.inputs['Scale'].default_value=(TEXTURE_TILING_FACTOR,TEXTURE_TILING_FACTOR,1.0)
-    links.new(texcoord.outputs['UV'], mapping.inputs['Vector'])
-    t_base=nodes.new("ShaderNodeTexImage"); t_base.location=(-450,150); t_base.image=base_img
-    links.new(mapping.outputs['Vector'], t_base.inputs['Vector'])
-    final=t_base.outputs['Color']
+    out=nodes.new("ShaderNodeOutputMaterial"); out.location=(500,0)
+    shader=nodes.new("ShaderNodeGroup"); shader.location=(200,0); shader.node_tree=terrain_shader_group()
+    links.new(shader.outputs["BSDF"], out.inputs["Surface"])
+    uv=nodes.new("ShaderNodeGroup"); uv.location=(-500,0); uv.node_tree=terrain_uv_group()
+    t_base=nodes.new("ShaderNodeTexImage"); t_base.location=(-250,150); t_base.image=base_img
+    links.new(uv.outputs["Vector"], t_base.inputs['Vector'])
+    links.new(t_base.outputs['Color'], shader.inputs["Base"])
     if a!=b and layer_rel:
         layer_img=load_ddj_image(map_root, layer_rel)
         if layer_img:
-            t_layer=nodes.new("ShaderNodeTexImage"); t_layer.location=(-450,-100); t_layer.image=layer_img
-            links.new(mapping.outputs['Vector'], t_layer.inputs['Vector'])
-            vattr=nodes.new("ShaderNodeAttribute"); vattr.location=(-450,-350); vattr.attribute_name="Blend"
-            mix=nodes.new("ShaderNodeMixRGB"); mix.location=(200,0); mix.blend_type='MIX'
-            links.new(t_base.outputs['Color'], mix.inputs['Color1'])
-            links.new(t_layer.outputs['Color'], mix.inputs['Color2'])
-            links.new(vattr.outputs['Color'], mix.inputs['Fac'])
-            final=mix.outputs['Color']
-    links.new(final, bsdf.inputs['Base Color'])
+            t_layer=nodes.new("ShaderNodeTexImage"); t_layer.location=(-250,-100); t_layer.image=layer_img
+            links.new(uv.outputs["Vector"], t_layer.inputs['Vector'])
+            vattr=nodes.new("ShaderNodeAttribute"); vattr.location=(-250,-350); vattr.attribute_name="Blend"
+            links.new(t_layer.outputs['Color'], shader.inputs["Layer"])
+            links.new(vattr.outputs['Color'], shader.inputs["Fac"])
     MATERIAL_CACHE[key]=mat
     return mat
 
-def paint_region(obj, tex_ids_flat, map_root):
+def dominant_pair(poly_t):
+    # Per row of 4 tex ids: the two most common ids, ties broken by first occurrence (Counter.most_common order).
+    eq=poly_t[:,:,None]==poly_t[:,None,:]
+    score=eq.sum(axis=2)*4-eq.argmax(axis=2)
+    rows=np.arange(len(poly_t))
+    base=poly_t[rows,score.argmax(axis=1)]
+    score[poly_t==base[:,None]]=-1
+    layer=np.where(score.max(axis=1)>=0, poly_t[rows,score.argmax(axis=1)], base)
+    return base, layer
+
+def paint_region(obj, tex_ids_flat, map_root, blend_layers=True):
     me=obj.data
     obj.data.materials.clear()
     if "Blend" in obj.data.vertex_colors:
         vcol=obj.data.vertex_colors["Blend"]
     else:
         vcol=obj.data.vertex_colors.new(name="Blend")
-    mat_faces=defaultdict(list)
-    for poly_idx, poly in enumerate(me.polygons):
-        vids=[me.loops[i].vertex_index for i in poly.loop_indices]
-        tids=[tex_ids_flat[v] for v in vids]
-        tids4=[decode_vertex_tex(t)[0] for t in tids]
-        common=[t for t,_ in Counter(tids4).most_common(2)]
-        if len(common)==1: common.append(common[0])
-        base_tid, layer_tid = common[0], common[1]
-        for li,loop_i in enumerate(poly.loop_indices):
-            vt = tids4[li]
-            fac = 1.0 if vt==layer_tid else 0.0
-            vcol.data[loop_i].color=(fac,fac,fac,1.0)
-        mat_faces[(base_tid,layer_tid)].append(poly_idx)
-    for (a,b), faces in mat_faces.items():
-        mat=get_pair_material(map_root,a,b)
+    # Region meshes are copies of the grid template, so quad p owns loops 4p..4p+3 (GRID_QUAD_VERTS[p]).
+    if len(me.loops)!=len(GRID_LOOP_VERTS): return
+    tids4,_=decode_vertex_tex(np.asarray(tex_ids_flat))
+    poly_t=tids4[GRID_QUAD_VERTS]
+    base,layer=dominant_pair(poly_t)
+    colors=np.ones((len(GRID_LOOP_VERTS),4), dtype=np.float32)
+    colors[:,:3]=(poly_t==layer[:,None]).astype(np.float32).reshape(-1,1)
+    vcol.data.foreach_set("color", colors.ravel())
+    # Without layer blending every quad gets its dominant texture only: at most one material per texture id.
+    pairs,inv=np.unique(base.astype(np.int64)*1024+(layer if blend_layers else base), return_inverse=True)
+    slots=np.zeros(len(pairs), dtype=np.int32)
+    for pi,code in enumerate(pairs.tolist()):
+        mat=get_pair_material(map_root,code//1024,code%1024)
         if not mat: continue
         if mat.name not in me.materials:
             me.materials.append(mat)
-        midx=me.materials.find(mat.name)
-        for fi in faces:
-            me.polygons[fi].material_index=midx
+        slots[pi]=me.materials.find(mat.name)
+    me.polygons.foreach_set("material_index", slots[inv.ravel()])
 
 def _named_region_enum_items(self, context):
     return [(n, f"{n} ({len(v)} tiles)", "") for n,v in NAMED_REGIONS_DATA.items()] or [("none","(no named regions)","")]
@@ -300,6 +448,7 @@ class SRO_ProjectProps(PropertyGroup):
     named_region_choice: EnumProperty(name="Area", items=_named_region_enum_items)
     height_scale: FloatProperty(name="Height Scale", default=1.0, min=0.01, max=100.0)
     import_textures: BoolProperty(name="Paint Terrain", default=True)
+    blend_layers: BoolProperty(name="Blend Texture Layers", default=True, description="One material per texture pair with vertex-colour blending. Off: one material per texture, fewer materials and faster shader compile")
 
 class SRO_OT_ParseData(Operator):
     bl_idname="sro.parse_data"; bl_label="Parse Game Data"
@@ -315,7 +464,7 @@ class SRO_OT_ParseData(Operator):
         try:
             global REGION_ORIENT, PARSED_REGIONS, NAMED_REGIONS_DATA, TERRAIN_DDJ, WARN_CNT, MATERIAL_CACHE, TEXTURE_CACHE
             WARN_CNT=0
-            MATERIAL_CACHE.clear(); TEXTURE_CACHE.clear()
+            MATERIAL_CACHE.clear(); TEXTURE_CACHE.clear(); RES_INDEX.clear()
             regs=parse_mfo(os.path.join(map_root,"mapinfo.mfo"))
             REGION_ORIENT=detect_orient(map_root, regs)
             exist=[]
@@ -333,6 +482,20 @@ class SRO_OT_ParseData(Operator):
             return {'CANCELLED'}
         return {'FINISHED'}
 
+class SRO_OT_ClearCache(Operator):
+    bl_idname="sro.clear_texture_cache"; bl_label="Clear Cache"
+    bl_description="Forget cached textures, materials, resource paths and decoded .m files"
+    def execute(self, ctx):
+        n_tex,n_mat=len(TEXTURE_CACHE),len(MATERIAL_CACHE)
+        TEXTURE_CACHE.clear(); MATERIAL_CACHE.clear(); RES_INDEX.clear(); DDS_PATHS.clear()
+        n_m=0
+        if os.path.isdir(MAPM_CACHE_DIR):
+            for e in os.scandir(MAPM_CACHE_DIR):
+                try: os.remove(e.path); n_m+=1
+                except OSError: pass
+        self.report({'INFO'}, f"Cleared {n_tex} textures, {n_mat} materials, {n_m} cached .m files.")
+        return {'FINISHED'}
+
 class SRO_OT_ExecuteImport(Operator):
     bl_idname="sro.execute_import"; bl_label="Import Map"
     @classmethod
@@ -360,37 +523,55 @@ class SRO_OT_ExecuteImport(Operator):
         zdeg=-90.0 if REGION_ORIENT=="ZX" else 0.0
         zrad=math.radians(zdeg)
         print(f"\n[INFO] Starting import: mode={p.import_mode}, tiles={len(tiles)}, Z-rot={zdeg} deg, textures={'ON' if p.import_textures else 'OFF'}")
-        coll=ensure_collection(coll_name)
+        # A new collection is filled outside the scene tree and linked once at the end, and mesh updates
+        # are deferred to one pass after all regions exist, so the depsgraph is not re-tagged per region.
+        coll=ensure_collection(coll_name, link=False)
+        link_coll_at_end=coll.users==0
         for ob in list(coll.objects):
             try: bpy.data.objects.remove(ob, do_unlink=True)
             except: pass
         MATERIAL_CACHE.clear()
-        created=0; t0=time.time()
+        template_mesh=build_grid_mesh("SRO_Grid_Template")
+        created=0; t0=time.time(); meshes=[]
+        jobs=[]
         for i,(rx,rz) in enumerate(tiles,1):
             a,b=(rx,rz) if REGION_ORIENT=="XZ" else (rz,rx)
             mpath=find_res(map_root,a,b,".m")
             if not mpath:
                 print(f"  [WARN] Missing .m for region ({rx},{rz})"); continue
-            name=f"Region_{rx:03d}_{rz:03d}"
-            try:
-                H,Tex=read_mapm_heights_and_tex(mpath)
-                cx,cy=region_center_world(rx,rz,REGION_ORIENT)
-                obj=create_grid_object(name,cx,cy)
-                for c in list(obj.users_collection): c.objects.unlink(obj)
-                coll.objects.link(obj)
-                apply_heights(obj,H,p.height_scale)
-                obj.rotation_euler=(0,0,zrad)
-                if p.import_textures and TERRAIN_DDJ:
-                    me=obj.data
-                    tex_flat=[0]*(len(me.vertices))
-                    for vid in range(len(me.vertices)):
-                        r=vid//VERTS_PER_AXIS; c=vid%VERTS_PER_AXIS
-                        tex_flat[vid]=Tex[r][c]
-                    paint_region(obj, tex_flat, map_root)
-                created+=1
-                print(f"  [{i:04d}/{len(tiles)}] OK: {name} processed.")
-            except Exception as e:
-                print(f"  [ERROR] Failed region ({rx},{rz}): {e}")
+            jobs.append((i,rx,rz,mpath))
+        # .m files are decoded (and their textures extracted) in worker threads; objects are created here on the main thread, in tile order.
+        # At most 2x workers regions are in flight, so parsed arrays and DDS extraction do not pile up ahead of painting.
+        workers=os.cpu_count() or 1; todo=iter(jobs)
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            paint=p.import_textures and bool(TERRAIN_DDJ)
+            pending=deque()
+            for job in todo:
+                pending.append((job, ex.submit(load_region_data, job[3], map_root, paint)))
+                if len(pending)>=2*workers: break
+            while pending:
+                (i,rx,rz,mpath),fut=pending.popleft()
+                nxt=next(todo,None)
+                if nxt: pending.append((nxt, ex.submit(load_region_data, nxt[3], map_root, paint)))
+                name=f"Region_{rx:03d}_{rz:03d}"
+                try:
+                    H,Tex=fut.result()
+                    cx,cy=region_center_world(rx,rz,REGION_ORIENT)
+                    obj=create_grid_object(name,cx,cy,template_mesh)
+                    coll.objects.link(obj)
+                    apply_heights(obj,H,p.height_scale)
+                    meshes.append(obj.data)
+                    obj.rotation_euler=(0,0,zrad)
+                    if paint:
+                        paint_region(obj, Tex.ravel(), map_root, p.blend_layers)
+                    created+=1
+                    print(f"  [{i:04d}/{len(tiles)}] OK: {name} processed.")
+                except Exception as e:
+                    print(f"  [ERROR] Failed region ({rx},{rz}): {e}")
+        bpy.data.meshes.remove(template_mesh)
+        for me in meshes: me.update()
+        if link_coll_at_end: ctx.scene.collection.children.link(coll)
+        ctx.view_layer.update()
         dt=time.time()-t0
         print(f"[OK] Import finished: {created} regions created/updated in {dt:.2f}s")
         self.report({'INFO'}, f"Import finished: {created} tiles in {dt:.2f}s.")
@@ -411,9 +592,11 @@ class SRO_PT_Project(Panel):
             col=b.column(align=True); col.prop(p,"import_mode",expand=True)
             if p.import_mode=='NAMED': col.prop(p,"named_region_choice")
             col.prop(p,"height_scale"); col.prop(p,"import_textures")
+            if p.import_textures: col.prop(p,"blend_layers")
+            col.operator(SRO_OT_ClearCache.bl_idname, icon='TRASH')
             layout.separator(); layout.operator(SRO_OT_ExecuteImport.bl_idname, icon='PLAY', text="Import Map")
 
-CLASSES=(SRO_ProjectProps,SRO_OT_ParseData,SRO_OT_ExecuteImport,SRO_PT_Project)
+CLASSES=(SRO_ProjectProps,SRO_OT_ParseData,SRO_OT_ClearCache,SRO_OT_ExecuteImport,SRO_PT_Project)
 
 def register():
     for c in CLASSES: bpy.utils.register_class(c)
@@ -425,7 +608,7 @@ def unregister():
     for c in reversed(CLASSES):
         try: bpy.utils.unregister_class(c)
         except: pass
-    TEXTURE_CACHE.clear(); MATERIAL_CACHE.clear()
+    TEXTURE_CACHE.clear(); MATERIAL_CACHE.clear(); RES_INDEX.clear(); DDS_PATHS.clear()
 
 if __name__ == "__main__":
     register()
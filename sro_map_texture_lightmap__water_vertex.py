@@ -8,10 +8,11 @@ bl_info = {
     "category": "Import-Export",
 }
 
-import bpy, os, re, time, math, struct, tempfile, array
+import bpy, os, re, time, math, struct, tempfile, hashlib, json, mmap, shutil
+import numpy as np
+from collections import deque
 from bpy.types import Operator, Panel, PropertyGroup
 from bpy.props import StringProperty, BoolProperty, PointerProperty, EnumProperty
-from collections import defaultdict, Counter
 from mathutils import Vector
 
 REGION_SIZE = 1920.0
@@ -30,8 +31,11 @@ LIGHTMAP_CACHE = {}
 MATERIAL_CACHE = {}
 WATER_TEX_CACHE = {}
 WATER_MAT_CACHE = {}
+RES_INDEX = {}
 MAX_WARN = 20
 WARN_CNT = 0
+# Kept in bpy.app.driver_namespace, which outlives module reloads, so the banner prints once per Blender session.
+_BANNER_KEY = "sro_map_project_banner_shown"
 TEMP_DIR = os.path.join(tempfile.gettempdir(), "sro_importer_cache")
 
 def _banner():
@@ -39,9 +43,14 @@ def _banner():
     time.sleep(0.2)
     v = bl_info["version"]
     print(f"[{bl_info['name']}] v{v[0]}.{v[1]}.{v[2]} loaded.")
-    os.makedirs(TEMP_DIR, exist_ok=True)
     print(f"[INFO] Cache directory set to: {TEMP_DIR}")
 
+def _reset_caches():
+    # Rebinds the caches to fresh dicts; the old tables (and their datablock references) are dropped in one go.
+    global TEXTURE_CACHE, LIGHTMAP_CACHE, MATERIAL_CACHE, WATER_TEX_CACHE, WATER_MAT_CACHE, RES_INDEX
+    TEXTURE_CACHE = {}; LIGHTMAP_CACHE = {}; MATERIAL_CACHE = {}
+    WATER_TEX_CACHE = {}; WATER_MAT_CACHE = {}; RES_INDEX = {}
+
 def validate_root(path: str) -> bool:
     if not path: return False
     for r in ("Data", "Music", "Map", "Media"):
@@ -49,30 +58,40 @@ def validate_root(path: str) -> bool:
     return os.path.isfile(os.path.join(path, "Map", "mapinfo.mfo"))
 
 def parse_mfo(mfo_path: str):
-    with open(mfo_path, "rb") as f:
-        if not f.read(12).startswith(b"JMXVMFO"): raise ValueError("Not a JMXVMFO file.")
-        f.read(4); f.read(8); bits = f.read(8192)
-    regs = []
-    for i, b in enumerate(bits):
-        if b == 0: continue
-        for k in range(8):
-            if (b >> k) & 1:
-                idx = i * 8 + k
-                x = idx & 0xFF
-                zr = (idx >> 8) & 0xFF
-                z = zr & 0x7F
-                regs.append((x, z, 1 if zr >= 128 else 0))
+    with open(mfo_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if not mm[:12].startswith(b"JMXVMFO"): raise ValueError("Not a JMXVMFO file.")
+        bits = np.frombuffer(mm[24:24 + 8192], dtype=np.uint8)
+    # Bit idx (LSB first): x = idx & 0xFF, zr = idx >> 8, bit 7 of zr is the dungeon flag.
+    idx = np.flatnonzero(np.unpackbits(bits, bitorder='little'))
+    zr = (idx >> 8) & 0xFF
+    regs = list(zip((idx & 0xFF).tolist(), (zr & 0x7F).tolist(), (zr >> 7).tolist()))
     print(f"[INFO] MFO OK: {len(regs)} active regions found.")
     return regs
 
+def _build_res_index(map_root):
+    # (a, b, ext) -> path, with the same preference order find_res used to probe: plain before zero-padded names.
+    idx, rank = {}, {}
+    for d in os.scandir(map_root):
+        if not (d.name.isdigit() and d.is_dir()): continue
+        a = int(d.name)
+        if d.name not in (str(a), f"{a:03d}"): continue
+        for f in os.scandir(d.path):
+            name, ext = os.path.splitext(f.name)
+            if not name.isdigit(): continue
+            b = int(name)
+            if name not in (str(b), f"{b:03d}") or not f.is_file(): continue
+            key = (a, b, ext.lower())
+            r = (d.name != str(a), name != str(b))
+            if key not in rank or r < rank[key]:
+                idx[key] = f.path
+                rank[key] = r
+    return idx
+
 def find_res(map_root, a, b, ext):
-    aS, bS, a3, b3 = str(a), str(b), f"{a:03d}", f"{b:03d}"
-    for p in (os.path.join(map_root, aS, bS + ext),
-              os.path.join(map_root, aS, b3 + ext),
-              os.path.join(map_root, a3, bS + ext),
-              os.path.join(map_root, a3, b3 + ext)):
-        if os.path.isfile(p): return p
-    return None
+    idx = RES_INDEX.get(map_root)
+    if idx is None:
+        idx = RES_INDEX[map_root] = _build_res_index(map_root)
+    return idx.get((a, b, ext.lower()))
 
 def detect_orient(map_root, regs):
     test = regs[:64] if len(regs) > 64 else regs
@@ -113,55 +132,68 @@ def parse_regioninfo(path):
         print(f"[ERROR] Could not parse regioninfo.txt: {e}")
     return {k: v for k, v in out.items() if v}
 
+_S_U32 = struct.Struct("<I")
+
+# JMXVMAPM block: 6 byte header, 17x17 vertices (height, texture, brightness),
+# water (type, wave, height), 16x16 tile ids and a 28 byte trailer.
+MAPM_VERTEX_DTYPE = np.dtype([('h', '<f4'), ('tex', '<u2'), ('b', 'u1')])
+MAPM_BLOCK_DTYPE = np.dtype([('head', 'V6'), ('verts', MAPM_VERTEX_DTYPE, (17, 17)),
+                             ('wtype', 'i1'), ('wwave', 'u1'), ('wheight', '<f4'),
+                             ('tiles', 'V512'), ('tail', 'V28')])
+
 def read_mapm_data(path_m: str):
-    H = [[0.0] * VERTS_PER_AXIS for _ in range(VERTS_PER_AXIS)]
-    T = [[0] * VERTS_PER_AXIS for _ in range(VERTS_PER_AXIS)]
-    B = [[255] * VERTS_PER_AXIS for _ in range(VERTS_PER_AXIS)]
+    # The parsers copy what they keep, so the mapping can be closed as soon as they return.
+    with open(path_m, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return parse_mapm_data(mm, os.path.basename(path_m))
+
+def parse_mapm_data(buf, name: str = ""):
+    H = np.zeros((VERTS_PER_AXIS, VERTS_PER_AXIS), dtype=np.float32)
+    T = np.zeros((VERTS_PER_AXIS, VERTS_PER_AXIS), dtype=np.uint16)
+    B = np.full((VERTS_PER_AXIS, VERTS_PER_AXIS), 255, dtype=np.uint8)
     W = []
-    with open(path_m, "rb") as f:
-        if not f.read(12).startswith(b"JMXVMAPM"): raise ValueError(f"Not a JMXVMAPM file: {os.path.basename(path_m)}")
-        for zb in range(BLOCKS_PER_AXIS):
-            for xb in range(BLOCKS_PER_AXIS):
-                f.read(4)
-                f.read(2)
-                for vz in range(17):
-                    for vx in range(17):
-                        h = struct.unpack("<f", f.read(4))[0]
-                        tex = struct.unpack("<H", f.read(2))[0]
-                        bright = struct.unpack("<B", f.read(1))[0]
-                        gx = xb * 16 + vx
-                        gz = zb * 16 + vz
-                        if gx < VERTS_PER_AXIS and gz < VERTS_PER_AXIS:
-                            H[gz][gx] = h
-                            T[gz][gx] = tex
-                            B[gz][gx] = bright
-                wtype, wwave, wheight = struct.unpack("<bBf", f.read(1 + 1 + 4))
-                f.read(16 * 16 * 2)
-                f.read(4 + 4 + 20)
-                if wtype >= 0:
-                    W.append((xb, zb, wheight, wtype, wwave))
+    if not bytes(buf[:12]).startswith(b"JMXVMAPM"): raise ValueError(f"Not a JMXVMAPM file: {name}")
+    blocks = np.frombuffer(buf, dtype=MAPM_BLOCK_DTYPE, count=BLOCKS_PER_AXIS * BLOCKS_PER_AXIS, offset=12).reshape(BLOCKS_PER_AXIS, BLOCKS_PER_AXIS)
+    for zb in range(BLOCKS_PER_AXIS):
+        for xb in range(BLOCKS_PER_AXIS):
+            blk = blocks[zb, xb]
+            # Neighbouring blocks share their edge row/column; the later block wins, as in file order.
+            gz, gx = zb * 16, xb * 16
+            H[gz:gz + 17, gx:gx + 17] = blk['verts']['h']
+            T[gz:gz + 17, gx:gx + 17] = blk['verts']['tex']
+            B[gz:gz + 17, gx:gx + 17] = blk['verts']['b']
+            if blk['wtype'] >= 0:
+                W.append((xb, zb, float(blk['wheight']), int(blk['wtype']), int(blk['wwave'])))
     return H, T, B, W
 
 def read_mapt_lightmap(path_t: str):
     print(f"    [INFO] Reading lightmap file: {os.path.basename(path_t)}")
     try:
-        with open(path_t, "rb") as f:
-            if not f.read(12).startswith(b"JMXVMAPT"):
-                print(f"    [WARN] Not a JMXVMAPT file or unknown version: {os.path.basename(path_t)}")
-                return None
-            f.seek(9216, 1)
-            buffer_size = struct.unpack("<I", f.read(4))[0]
-            f.read(4)
-            if buffer_size > 0:
-                print(f"    [INFO] Lightmap DDS buffer found, size: {buffer_size} bytes.")
-                return f.read(buffer_size)
-            else:
-                print(f"    [WARN] Lightmap file contains no DDS data.")
-                return None
+        with open(path_t, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return parse_mapt_lightmap(mm, os.path.basename(path_t))
     except Exception as e:
         print(f"    [ERROR] Failed to read lightmap file {os.path.basename(path_t)}: {e}")
         return None
 
+def parse_mapt_lightmap(buf, name: str = ""):
+    if not bytes(buf[:12]).startswith(b"JMXVMAPT"):
+        print(f"    [WARN] Not a JMXVMAPT file or unknown version: {name}")
+        return None
+    off = 12 + 9216
+    buffer_size = _S_U32.unpack_from(buf, off)[0]
+    off += 8
+    if buffer_size > 0:
+        print(f"    [INFO] Lightmap DDS buffer found, size: {buffer_size} bytes.")
+        return bytes(buf[off:off + buffer_size])
+    else:
+        print(f"    [WARN] Lightmap file contains no DDS data.")
+        return None
+
+def load_region_files(path_m: str, path_t=None):
+    # Worker-thread part of a region import: file I/O and parsing only, no bpy access.
+    H, T, B, W = read_mapm_data(path_m)
+    dds_data = read_mapt_lightmap(path_t) if path_t else None
+    return H, T, B, W, dds_data
+
 def decode_vertex_tex(vtex: int):
     tid = vtex & 0x03FF
     scl = (vtex >> 10) & 0x3F
@@ -173,6 +205,27 @@ def parse_tile2d_ifo(root):
     if not path:
         print(f"[WARN] tile2d.ifo not found.")
         return []
+    st = os.stat(path)
+    path_key = hashlib.blake2b(os.path.normcase(os.path.abspath(path)).encode("utf-8", "surrogatepass"), digest_size=8).hexdigest()
+    cache_path = os.path.join(TEMP_DIR, f"tile2d_{path_key}.{st.st_mtime_ns}.{st.st_size}.json")
+    if os.path.isfile(cache_path):
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f: out = json.load(f)
+            print(f"[INFO] Loaded {len(out)} texture paths from tile2d.ifo (cached).")
+            return out
+        except (OSError, ValueError) as e:
+            print(f"[WARN] Ignoring broken tile2d cache {cache_path}: {e}")
+    out = _read_tile2d_paths(path)
+    if out:
+        try:
+            os.makedirs(TEMP_DIR, exist_ok=True)
+            with open(cache_path + ".part", "w", encoding="utf-8") as f: json.dump(out, f)
+            os.replace(cache_path + ".part", cache_path)
+        except OSError as e:
+            print(f"[WARN] Could not write tile2d cache {cache_path}: {e}")
+    return out
+
+def _read_tile2d_paths(path):
     txt = ""
     for enc in ("cp1250", "cp949", "utf-8", "latin-1"):
         try:
@@ -196,6 +249,22 @@ def parse_tile2d_ifo(root):
     print(f"[INFO] Loaded {len(out)} texture paths from tile2d.ifo.")
     return out
 
+def copy_file_tail(src_path: str, dst_path: str, skip: int):
+    # Copies src[skip:] to dst_path (via a .part file) without pulling the payload into Python where the OS allows it.
+    part_path = dst_path + ".part"
+    with open(src_path, "rb") as src, open(part_path, "wb") as dst:
+        try:
+            offset, remaining = skip, os.fstat(src.fileno()).st_size - skip
+            while remaining > 0:
+                sent = os.sendfile(dst.fileno(), src.fileno(), offset, remaining)
+                if sent == 0: break
+                offset += sent; remaining -= sent
+        except (AttributeError, OSError):
+            dst.seek(0); dst.truncate()
+            src.seek(skip)
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+    os.replace(part_path, dst_path)
+
 def load_ddj_image(sro_root: str, rel_path: str, cache: dict):
     global WARN_CNT
     if not rel_path: return None
@@ -212,12 +281,15 @@ def load_ddj_image(sro_root: str, rel_path: str, cache: dict):
     key = os.path.normcase(ddj_path)
     if key in cache: return cache[key]
     try:
-        with open(ddj_path, "rb") as f: data = f.read()
-        if len(data) < 20: return None
-        dds_data = data[20:]
-        temp_path = os.path.join(TEMP_DIR, f"tex_{os.path.basename(ddj_path)}.{int(os.path.getmtime(ddj_path))}.dds")
+        st = os.stat(ddj_path)
+        if st.st_size < 20: return None
+        # Named by a hash of the DDS payload, so same-named DDJs from different tile folders never share a file.
+        with open(ddj_path, "rb") as f:
+            f.seek(20)
+            digest = hashlib.file_digest(f, lambda: hashlib.blake2b(digest_size=16)).hexdigest()
+        temp_path = os.path.join(TEMP_DIR, f"tex_{digest}.dds")
         if not os.path.exists(temp_path):
-            with open(temp_path, "wb") as w: w.write(dds_data)
+            copy_file_tail(ddj_path, temp_path, 20)
         img = bpy.data.images.load(temp_path, check_existing=True)
         cache[key] = img
         return img
@@ -226,16 +298,19 @@ def load_ddj_image(sro_root: str, rel_path: str, cache: dict):
         return None
 
 def load_dds_from_data(dds_data, name: str):
-    key = name
+    # Keyed by content: regions with identical lightmaps share one image (and therefore one set of materials).
+    key = hashlib.blake2b(dds_data, digest_size=8).hexdigest()
     if key in LIGHTMAP_CACHE: return LIGHTMAP_CACHE[key]
     try:
-        temp_path = os.path.join(TEMP_DIR, f"lm_{name}.dds")
+        temp_path = os.path.join(TEMP_DIR, f"lm_{key}.dds")
         if not os.path.exists(temp_path):
-            with open(temp_path, "wb") as w: w.write(dds_data)
+            with open(temp_path + ".part", "wb") as w: w.write(dds_data)
+            os.replace(temp_path + ".part", temp_path)
         img = bpy.data.images.load(temp_path, check_existing=True)
         img.colorspace_settings.name = 'Non-Color'
+        img["sro_lightmap_key"] = key
         LIGHTMAP_CACHE[key] = img
-        print(f"    [INFO] Successfully loaded lightmap image '{name}' from DDS data.")
+        print(f"    [INFO] Successfully loaded lightmap image for '{name}' from DDS data.")
         return img
     except Exception as e:
         print(f"    [ERROR] Failed to load DDS from data for '{name}': {e}")
@@ -248,22 +323,53 @@ def ensure_collection(name: str):
         bpy.context.scene.collection.children.link(coll)
     return coll
 
-def create_grid_object(name: str, cx: float, cy: float):
-    bpy.ops.mesh.primitive_grid_add(x_subdivisions=VERTS_PER_AXIS - 1, y_subdivisions=VERTS_PER_AXIS - 1, size=REGION_SIZE, align='WORLD', enter_editmode=False, location=(cx, cy, 0.0))
-    obj = bpy.context.active_object
-    obj.name = name
+def _build_grid_template():
+    # Same layout as primitive_grid_add(size=REGION_SIZE): vertex i at column i % 97, row i // 97, centred on the origin.
+    n = VERTS_PER_AXIS
+    steps = (np.arange(n, dtype=np.float32) - (n - 1) * 0.5) * (REGION_SIZE / (n - 1))
+    gx, gy = np.meshgrid(steps, steps)
+    xy = np.stack([gx.ravel(), gy.ravel()], axis=-1)
+    v = (np.arange(n - 1)[:, None] * n + np.arange(n - 1)[None, :]).ravel()
+    loop_verts = np.stack([v, v + 1, v + 1 + n, v + n], axis=-1).ravel().astype(np.int32)
+    loop_start = np.arange(0, len(loop_verts), 4, dtype=np.int32)
+    uv = np.stack([loop_verts % n, loop_verts // n], axis=-1).astype(np.float32).ravel() / (n - 1)
+    return xy, loop_verts, loop_start, uv
+
+GRID_XY, GRID_LOOP_VERTS, GRID_LOOP_START, GRID_LOOP_UV = _build_grid_template()
+GRID_QUAD_VERTS = GRID_LOOP_VERTS.reshape(-1, 4)
+
+def build_grid_mesh(name: str):
+    me = bpy.data.meshes.new(name)
+    co = np.zeros((VERTS_PER_AXIS * VERTS_PER_AXIS, 3), dtype=np.float32)
+    co[:, :2] = GRID_XY
+    me.vertices.add(len(co))
+    me.vertices.foreach_set("co", co.ravel())
+    me.loops.add(len(GRID_LOOP_VERTS))
+    me.loops.foreach_set("vertex_index", GRID_LOOP_VERTS)
+    me.polygons.add(len(GRID_LOOP_START))
+    me.polygons.foreach_set("loop_start", GRID_LOOP_START)
+    me.uv_layers.new(name="UVMap").data.foreach_set("uv", GRID_LOOP_UV)
+    me.update(calc_edges=True)
+    return me
+
+def create_grid_object(name: str, cx: float, cy: float, template_mesh=None):
+    # Regions only differ in heights, colours and materials, so a prebuilt grid is copied when one is given.
+    if template_mesh is not None:
+        me = template_mesh.copy()
+        me.name = name
+    else:
+        me = build_grid_mesh(name)
+    obj = bpy.data.objects.new(name, me)
+    obj.location = (cx, cy, 0.0)
     return obj
 
 def apply_heights(obj, H):
     me = obj.data
     if len(me.vertices) != VERTS_PER_AXIS * VERTS_PER_AXIS: return
-    coords = array.array('f', [0.0] * (len(me.vertices) * 3))
-    me.vertices.foreach_get("co", coords)
-    for i in range(len(me.vertices)):
-        r = i // VERTS_PER_AXIS
-        c = i % VERTS_PER_AXIS
-        coords[i * 3 + 2] = H[r][c]
-    me.vertices.foreach_set("co", coords)
+    coords = np.empty((len(me.vertices), 3), dtype=np.float32)
+    coords[:, :2] = GRID_XY
+    coords[:, 2] = H.ravel()
+    me.vertices.foreach_set("co", coords.ravel())
     me.update()
 
 def choose_water_images(sro_root, wtype, wwave):
@@ -338,7 +444,7 @@ def get_water_material(sro_root, wtype, wwave):
     return mat
 
 def create_water_object(region_name, cx, cy, water_blocks, rot_z, sro_root, coll):
-    if not water_blocks: return
+    if not water_blocks: return None
     verts, faces, face_keys = [], [], []
     for xb, zb, h, wtype, wwave in water_blocks:
         x0 = -REGION_SIZE * 0.5 + xb * BLOCK_SIZE
@@ -359,32 +465,90 @@ def create_water_object(region_name, cx, cy, water_blocks, rot_z, sro_root, coll
     obj.location = (cx, cy, 0.0)
     obj.rotation_euler = (0, 0, rot_z)
     uv_layer = me.uv_layers.new(name="WaterUV")
-    for poly in me.polygons:
-        li = poly.loop_indices
-        uv_layer.data[li[0]].uv = (0.0, 0.0)
-        uv_layer.data[li[1]].uv = (WATER_TILING_FACTOR, 0.0)
-        uv_layer.data[li[2]].uv = (WATER_TILING_FACTOR, WATER_TILING_FACTOR)
-        uv_layer.data[li[3]].uv = (0.0, WATER_TILING_FACTOR)
-    for fi, (wtype, wwave) in enumerate(face_keys):
-        mat = get_water_material(sro_root, wtype, wwave)
-        if mat and mat.name not in me.materials:
+    # from_pydata lays the loops of each quad out consecutively, so one UV pattern per face covers them all.
+    uv_quad = np.array([0.0, 0.0, WATER_TILING_FACTOR, 0.0, WATER_TILING_FACTOR, WATER_TILING_FACTOR, 0.0, WATER_TILING_FACTOR], dtype=np.float32)
+    uv_layer.data.foreach_set("uv", np.tile(uv_quad, len(faces)))
+    slot_of_key = {}
+    for wkey in dict.fromkeys(face_keys):
+        mat = get_water_material(sro_root, *wkey)
+        if not mat: continue
+        if mat.name not in me.materials:
             me.materials.append(mat)
-        if mat:
-            me.polygons[fi].material_index = me.materials.find(mat.name)
+        slot_of_key[wkey] = me.materials.find(mat.name)
+    me.polygons.foreach_set("material_index", np.array([slot_of_key.get(k, 0) for k in face_keys], dtype=np.int32))
     me.update()
     print(f"    [INFO] Created single water object for region {region_name} with {len(faces)} blocks.")
+    return obj
+
+def terrain_uv_group():
+    # Shared UV scaffold: raw region UV (lightmap) and the same UV tiled TEXTURE_TILING_FACTOR times (terrain textures).
+    ng = bpy.data.node_groups.get("SRO_TerrainUV")
+    if ng: return ng
+    ng = bpy.data.node_groups.new("SRO_TerrainUV", "ShaderNodeTree")
+    ng.interface.new_socket(name="Tiled", in_out='OUTPUT', socket_type='NodeSocketVector')
+    ng.interface.new_socket(name="UV", in_out='OUTPUT', socket_type='NodeSocketVector')
+    nodes = ng.nodes
+    links = ng.links
+    texcoord = nodes.new("ShaderNodeTexCoord"); texcoord.location = Vector((-400, 0))
+    mapping = nodes.new("ShaderNodeMapping"); mapping.location = Vector((-200, 0))
+    mapping.inputs['Scale'].default_value = (TEXTURE_TILING_FACTOR, TEXTURE_TILING_FACTOR, 1.0)
+    gout = nodes.new("NodeGroupOutput"); gout.location = Vector((0, 0))
+    links.new(texcoord.outputs['UV'], mapping.inputs['Vector'])
+    links.new(mapping.outputs['Vector'], gout.inputs["Tiled"])
+    links.new(texcoord.outputs['UV'], gout.inputs["UV"])
+    return ng
+
+def terrain_pair_group():
+    # Shared shading scaffold: mix(Base, Layer, Fac) * VBright * Lightmap -> Principled.
+    # Unlinked inputs fall back to no-ops (Fac 0, white VBright/Lightmap), so every material variant uses this one group.
+    ng = bpy.data.node_groups.get("SRO_TerrainPair")
+    if ng: return ng
+    ng = bpy.data.node_groups.new("SRO_TerrainPair", "ShaderNodeTree")
+    iface = ng.interface
+    iface.new_socket(name="Base", in_out='INPUT', socket_type='NodeSocketColor')
+    iface.new_socket(name="Layer", in_out='INPUT', socket_type='NodeSocketColor')
+    fac = iface.new_socket(name="Fac", in_out='INPUT', socket_type='NodeSocketFloat')
+    fac.default_value = 0.0; fac.min_value = 0.0; fac.max_value = 1.0
+    iface.new_socket(name="VBright", in_out='INPUT', socket_type='NodeSocketColor').default_value = (1.0, 1.0, 1.0, 1.0)
+    iface.new_socket(name="Lightmap", in_out='INPUT', socket_type='NodeSocketColor').default_value = (1.0, 1.0, 1.0, 1.0)
+    iface.new_socket(name="BSDF", in_out='OUTPUT', socket_type='NodeSocketShader')
+    nodes = ng.nodes
+    links = ng.links
+    gin = nodes.new("NodeGroupInput"); gin.location = Vector((-800, 0))
+    mix = nodes.new("ShaderNodeMixRGB"); mix.location = Vector((-550, 100))
+    mul_vb = nodes.new("ShaderNodeMixRGB"); mul_vb.location = Vector((-350, 0)); mul_vb.blend_type = 'MULTIPLY'
+    mul_vb.inputs['Fac'].default_value = 1.0
+    lm_mix = nodes.new("ShaderNodeMixRGB"); lm_mix.location = Vector((-150, -100)); lm_mix.blend_type = 'MULTIPLY'
+    lm_mix.inputs['Fac'].default_value = 1.0
+    bsdf = nodes.new("ShaderNodeBsdfPrincipled"); bsdf.location = Vector((100, 0))
+    sp = bsdf.inputs.get("Specular") or bsdf.inputs.get("Specular IOR Level")
+    if sp: sp.default_value = 0.0
+    ro = bsdf.inputs.get("Roughness")
+    if ro: ro.default_value = 0.9
+    gout = nodes.new("NodeGroupOutput"); gout.location = Vector((400, 0))
+    links.new(gin.outputs["Base"], mix.inputs['Color1'])
+    links.new(gin.outputs["Layer"], mix.inputs['Color2'])
+    links.new(gin.outputs["Fac"], mix.inputs['Fac'])
+    links.new(mix.outputs['Color'], mul_vb.inputs['Color1'])
+    links.new(gin.outputs["VBright"], mul_vb.inputs['Color2'])
+    links.new(mul_vb.outputs['Color'], lm_mix.inputs['Color1'])
+    links.new(gin.outputs["Lightmap"], lm_mix.inputs['Color2'])
+    links.new(lm_mix.outputs['Color'], bsdf.inputs['Base Color'])
+    links.new(bsdf.outputs["BSDF"], gout.inputs["BSDF"])
+    return ng
 
 def get_pair_material(sro_root, base_tid, layer_tid, lightmap_img, use_vbright):
     a = min(base_tid, layer_tid)
     b = max(base_tid, layer_tid)
-    key = (a, b, lightmap_img.name if lightmap_img else None, bool(use_vbright))
+    lm_key = lightmap_img.get("sro_lightmap_key", lightmap_img.name) if lightmap_img else None
+    key = (a, b, lm_key, bool(use_vbright))
     if key in MATERIAL_CACHE: return MATERIAL_CACHE[key]
     base_rel = TERRAIN_DDJ[a] if 0 <= a < len(TERRAIN_DDJ) else None
     layer_rel = TERRAIN_DDJ[b] if 0 <= b < len(TERRAIN_DDJ) else None
     base_img = load_ddj_image(sro_root, base_rel, TEXTURE_CACHE) if base_rel else None
     if not base_img: return None
     mat_name = f"MAT_{a:03d}_{b:03d}"
-    if lightmap_img: mat_name += "_LM"
+    if lightmap_img: mat_name += f"_LM_{lm_key}"
     if use_vbright: mat_name += "_VB"
     if mat_name in bpy.data.materials:
         mat = bpy.data.materials[mat_name]
@@ -396,97 +560,108 @@ def get_pair_material(sro_root, base_tid, layer_tid, lightmap_img, use_vbright):
     nodes = nt.nodes
     links = nt.links
     for n in list(nodes): nodes.remove(n)
-    out = nodes.new("ShaderNodeOutputMaterial"); out.location = Vector((900, 0))
-    bsdf = nodes.new("ShaderNodeBsdfPrincipled"); bsdf.location = Vector((700, 0))
-    sp = bsdf.inputs.get("Specular") or bsdf.inputs.get("Specular IOR Level")
-    if sp: sp.default_value = 0.0
-    ro = bsdf.inputs.get("Roughness")
-    if ro: ro.default_value = 0.9
-    links.new(bsdf.outputs["BSDF"], out.inputs["Surface"])
-    texcoord = nodes.new("ShaderNodeTexCoord"); texcoord.location = Vector((-900, 0))
-    mapping = nodes.new("ShaderNodeMapping"); mapping.location = Vector((-700, 0))
-    mapping.inputs['Scale'].default_value = (TEXTURE_TILING_FACTOR, TEXTURE_TILING_FACTOR, 1.0)
-    links.new(texcoord.outputs['UV'], mapping.inputs['Vector'])
-    t_base = nodes.new("ShaderNodeTexImage"); t_base.location = Vector((-450, 150))
+    out = nodes.new("ShaderNodeOutputMaterial"); out.location = Vector((500, 0))
+    shader = nodes.new("ShaderNodeGroup"); shader.location = Vector((200, 0))
+    shader.node_tree = terrain_pair_group()
+    links.new(shader.outputs["BSDF"], out.inputs["Surface"])
+    uv = nodes.new("ShaderNodeGroup"); uv.location = Vector((-700, 0))
+    uv.node_tree = terrain_uv_group()
+    t_base = nodes.new("ShaderNodeTexImage"); t_base.location = Vector((-400, 300))
     t_base.image = base_img
-    links.new(mapping.outputs['Vector'], t_base.inputs['Vector'])
-    final_color_node = t_base
+    links.new(uv.outputs["Tiled"], t_base.inputs['Vector'])
+    links.new(t_base.outputs['Color'], shader.inputs["Base"])
     if a != b and layer_rel:
         layer_img = load_ddj_image(sro_root, layer_rel, TEXTURE_CACHE)
         if layer_img:
-            t_layer = nodes.new("ShaderNodeTexImage"); t_layer.location = Vector((-450, -100))
+            t_layer = nodes.new("ShaderNodeTexImage"); t_layer.location = Vector((-400, 50))
             t_layer.image = layer_img
-            links.new(mapping.outputs['Vector'], t_layer.inputs['Vector'])
-            vattr = nodes.new("ShaderNodeAttribute"); vattr.location = Vector((-450, -350))
+            links.new(uv.outputs["Tiled"], t_layer.inputs['Vector'])
+            vattr = nodes.new("ShaderNodeAttribute"); vattr.location = Vector((-400, -200))
             vattr.attribute_name = "Blend"
-            mix = nodes.new("ShaderNodeMixRGB"); mix.location = Vector((200, 0))
-            links.new(t_base.outputs['Color'], mix.inputs['Color1'])
-            links.new(t_layer.outputs['Color'], mix.inputs['Color2'])
-            links.new(vattr.outputs['Color'], mix.inputs['Fac'])
-            final_color_node = mix
+            links.new(t_layer.outputs['Color'], shader.inputs["Layer"])
+            links.new(vattr.outputs['Color'], shader.inputs["Fac"])
     if use_vbright:
-        vattr_vb = nodes.new("ShaderNodeAttribute"); vattr_vb.location = Vector((200, -260))
+        vattr_vb = nodes.new("ShaderNodeAttribute"); vattr_vb.location = Vector((-400, -400))
         vattr_vb.attribute_name = "VBright"
-        mul_vb = nodes.new("ShaderNodeMixRGB"); mul_vb.location = Vector((450, -100)); mul_vb.blend_type = 'MULTIPLY'
-        mul_vb.inputs['Fac'].default_value = 1.0
-        links.new(final_color_node.outputs['Color'], mul_vb.inputs['Color1'])
-        links.new(vattr_vb.outputs['Color'], mul_vb.inputs['Color2'])
-        final_color_node = mul_vb
+        links.new(vattr_vb.outputs['Color'], shader.inputs["VBright"])
     if lightmap_img:
-        lm_tex = nodes.new("ShaderNodeTexImage"); lm_tex.location = Vector((0, -420))
+        lm_tex = nodes.new("ShaderNodeTexImage"); lm_tex.location = Vector((-400, -600))
         lm_tex.image = lightmap_img
         lm_tex.interpolation = 'Linear'
         lm_tex.projection = 'FLAT'
-        links.new(texcoord.outputs['UV'], lm_tex.inputs['Vector'])
-        lm_mix = nodes.new("ShaderNodeMixRGB"); lm_mix.location = Vector((700, -20))
-        lm_mix.blend_type = 'MULTIPLY'
-        lm_mix.inputs['Fac'].default_value = 1.0
-        links.new(final_color_node.outputs['Color'], lm_mix.inputs['Color1'])
-        links.new(lm_tex.outputs['Color'], lm_mix.inputs['Color2'])
-        final_color_node = lm_mix
-    links.new(final_color_node.outputs['Color'], bsdf.inputs['Base Color'])
+        links.new(uv.outputs["UV"], lm_tex.inputs['Vector'])
+        links.new(lm_tex.outputs['Color'], shader.inputs["Lightmap"])
     MATERIAL_CACHE[key] = mat
     return mat
 
+def dominant_pair(poly_t):
+    # Per row of 4 tex ids: the two most common ids, ties broken by first occurrence (Counter.most_common order).
+    eq = poly_t[:, :, None] == poly_t[:, None, :]
+    score = eq.sum(axis=2) * 4 - eq.argmax(axis=2)
+    rows = np.arange(len(poly_t))
+    base = poly_t[rows, score.argmax(axis=1)]
+    score[poly_t == base[:, None]] = -1
+    layer = np.where(score.max(axis=1) >= 0, poly_t[rows, score.argmax(axis=1)], base)
+    return base, layer
+
 def paint_region(obj, tex_ids_flat, sro_root, lightmap_img, use_vbright, vbright_flat=None):
     me = obj.data
     me.materials.clear()
     if "Blend" in me.color_attributes:
         vcol = me.color_attributes["Blend"]
     else:
-        vcol = me.color_attributes.new(name="Blend", type='FLOAT_COLOR', domain='CORNER')
+        vcol = me.color_attributes.new(name="Blend", type='BYTE_COLOR', domain='CORNER')
     vb_attr = None
     if use_vbright:
-        vb_attr = me.color_attributes.get("VBright") or me.color_attributes.new(name="VBright", type='FLOAT_COLOR', domain='CORNER')
-    mat_faces = defaultdict(list)
-    for poly_idx, poly in enumerate(me.polygons):
-        vids = [me.loops[i].vertex_index for i in poly.loop_indices]
-        tids = [tex_ids_flat[v] for v in vids]
-        tids4 = [decode_vertex_tex(t)[0] for t in tids]
-        common = [t for t, _ in Counter(tids4).most_common(2)]
-        if not common: continue
-        if len(common) == 1: common.append(common[0])
-        base_tid, layer_tid = common[0], common[1]
-        for li, loop_i in enumerate(poly.loop_indices):
-            vt = tids4[li]
-            fac = 1.0 if vt == layer_tid else 0.0
-            vcol.data[loop_i].color = (fac, fac, fac, 1.0)
-            if use_vbright and vbright_flat is not None:
-                vv = max(0.0, min(1.0, vbright_flat[vids[li]]))
-                vb_attr.data[loop_i].color = (vv, vv, vv, 1.0)
-        mat_faces[(base_tid, layer_tid)].append(poly_idx)
-    for (a, b), faces in mat_faces.items():
-        mat = get_pair_material(sro_root, a, b, lightmap_img, use_vbright)
+        vb_attr = me.color_attributes.get("VBright") or me.color_attributes.new(name="VBright", type='BYTE_COLOR', domain='CORNER')
+    # Region meshes are built from the grid constants, so quad p owns loops 4p..4p+3 and GRID_QUAD_VERTS[p].
+    nloop = len(me.loops)
+    if nloop != len(GRID_LOOP_VERTS): return
+    tids4, _ = decode_vertex_tex(np.asarray(tex_ids_flat))
+    poly_t = tids4[GRID_QUAD_VERTS]
+    base, layer = dominant_pair(poly_t)
+    blend = np.ones((nloop, 4), dtype=np.float32)
+    blend[:, :3] = (poly_t == layer[:, None]).astype(np.float32).reshape(-1, 1)
+    vcol.data.foreach_set("color", blend.ravel())
+    if use_vbright and vbright_flat is not None:
+        vbright = np.ones((nloop, 4), dtype=np.float32)
+        vbright[:, :3] = np.clip(np.asarray(vbright_flat, dtype=np.float32)[GRID_LOOP_VERTS], 0.0, 1.0)[:, None]
+        vb_attr.data.foreach_set("color", vbright.ravel())
+    pairs, inv = np.unique(base.astype(np.int64) * 1024 + layer, return_inverse=True)
+    slots = np.zeros(len(pairs), dtype=np.int32)
+    for pi, code in enumerate(pairs.tolist()):
+        mat = get_pair_material(sro_root, code // 1024, code % 1024, lightmap_img, use_vbright)
         if not mat: continue
         if mat.name not in me.materials:
             me.materials.append(mat)
-        midx = me.materials.find(mat.name)
-        for fi in faces:
-            me.polygons[fi].material_index = midx
+        slots[pi] = me.materials.find(mat.name)
+    me.polygons.foreach_set("material_index", slots[inv.ravel()])
+
+def join_objects(ctx, objs, name: str):
+    # Joins the imported region objects into one (bpy.ops.object.join keeps materials, UVs and color
+    # attributes and bakes each region's transform into the merged mesh).
+    if len(objs) < 2: return objs[0] if objs else None
+    try:
+        with ctx.temp_override(active_object=objs[0], object=objs[0], selected_objects=objs, selected_editable_objects=objs):
+            bpy.ops.object.join()
+    except Exception as e:
+        print(f"[WARN] Could not merge {len(objs)} objects into {name}: {e}")
+        return None
+    merged = objs[0]
+    merged.name = name
+    merged.data.name = f"{name}_Mesh"
+    print(f"[INFO] Merged {len(objs)} objects into {name}.")
+    return merged
+
+_NAMED_REGION_ITEMS = []
 
 def _named_region_enum_items(self, context):
-    items = [(n, f"{n} ({len(v)} tiles)", "") for n, v in NAMED_REGIONS_DATA.items()]
-    return items or [("none", "(no named regions found)", "Check regioninfo.txt path and content")]
+    # Built once per parse; Blender also needs the returned list (and its strings) kept alive.
+    global _NAMED_REGION_ITEMS
+    if not _NAMED_REGION_ITEMS:
+        items = [(n, f"{n} ({len(v)} tiles)", "") for n, v in NAMED_REGIONS_DATA.items()]
+        _NAMED_REGION_ITEMS = items or [("none", "(no named regions found)", "Check regioninfo.txt path and content")]
+    return _NAMED_REGION_ITEMS
 
 class SRO_ProjectProps(PropertyGroup):
     sro_root: StringProperty(name="Silkroad Root", subtype='DIR_PATH')
@@ -503,6 +678,9 @@ class SRO_ProjectProps(PropertyGroup):
     import_lightmaps: BoolProperty(name="Import Lightmaps", default=True)
     import_vertex_brightness: BoolProperty(name="Import Vertex Brightness", default=False)
     import_water: BoolProperty(name="Import Water", default=True)
+    merge_regions: BoolProperty(name="Merge Regions", default=False, description="Join all imported regions into one terrain object (and one water object) for fewer objects and draw calls")
+
+_SRO_PROPS_PTR = PointerProperty(type=SRO_ProjectProps)
 
 class SRO_OT_ParseData(Operator):
     bl_idname = "sro.parse_data"
@@ -521,11 +699,9 @@ class SRO_OT_ParseData(Operator):
         p.is_root_valid = True
         map_root = os.path.join(root, "Map")
         try:
-            global REGION_ORIENT, PARSED_REGIONS, NAMED_REGIONS_DATA, TERRAIN_DDJ, WARN_CNT
-            global MATERIAL_CACHE, TEXTURE_CACHE, LIGHTMAP_CACHE, WATER_MAT_CACHE, WATER_TEX_CACHE
+            global REGION_ORIENT, PARSED_REGIONS, NAMED_REGIONS_DATA, TERRAIN_DDJ, WARN_CNT, _NAMED_REGION_ITEMS
             WARN_CNT = 0
-            MATERIAL_CACHE.clear(); TEXTURE_CACHE.clear(); LIGHTMAP_CACHE.clear()
-            WATER_MAT_CACHE.clear(); WATER_TEX_CACHE.clear()
+            _reset_caches()
             regs = parse_mfo(os.path.join(map_root, "mapinfo.mfo"))
             REGION_ORIENT = detect_orient(map_root, regs)
             exist = []
@@ -537,6 +713,7 @@ class SRO_OT_ParseData(Operator):
             PARSED_REGIONS = sorted(exist, key=lambda t:(t[0], t[1]))
             print(f"[INFO] Found {len(PARSED_REGIONS)} existing region files.")
             NAMED_REGIONS_DATA = parse_regioninfo(os.path.join(root, "Data", "regioninfo.txt"))
+            _NAMED_REGION_ITEMS = []
             TERRAIN_DDJ = parse_tile2d_ifo(root)
             p.is_data_parsed = True
             report_msg = f"Parse successful: {len(PARSED_REGIONS)} regions, {len(NAMED_REGIONS_DATA)} named areas. Orientation: {REGION_ORIENT}"
@@ -588,14 +765,20 @@ class SRO_OT_ExecuteImport(Operator):
         print(f"  Paint Terrain: {'ON' if p.import_textures else 'OFF'}, Import Lightmaps: {'ON' if p.import_lightmaps else 'OFF'}, Import Vertex Brightness: {'ON' if p.import_vertex_brightness else 'OFF'}, Import Water: {'ON' if p.import_water else 'OFF'}")
         coll = ensure_collection(coll_name)
         bpy.context.view_layer.objects.active = None
-        for ob in list(coll.objects):
+        old_objs = list(coll.objects)
+        if old_objs:
+            # Meshes used only by these objects go in the same batch instead of lingering as orphans.
+            old_meshes = {ob.data for ob in old_objs if ob.type == 'MESH' and ob.data and ob.data.users == 1}
             try:
-                bpy.data.objects.remove(ob, do_unlink=True)
-            except:
-                pass
+                bpy.data.batch_remove(ids=old_objs + list(old_meshes))
+            except Exception as e:
+                print(f"[WARN] Could not remove previously imported objects: {e}")
         MATERIAL_CACHE.clear()
         created = 0
         t0 = time.time()
+        template_mesh = build_grid_mesh("SRO_Grid_Template")
+        terrain_objs, water_objs = [], []
+        jobs = []
         for i, (rx, rz) in enumerate(tiles, 1):
             a, b = (rx, rz) if REGION_ORIENT == "XZ" else (rz, rx)
             mpath = find_res(map_root, a, b, ".m")
@@ -603,47 +786,63 @@ class SRO_OT_ExecuteImport(Operator):
                 print(f"  [{i:04d}/{len(tiles)}] [WARN] Missing .m file for region ({rx},{rz}). Skipping.")
                 continue
             name = f"Region_{rx:03d}_{rz:03d}"
-            print(f"  [{i:04d}/{len(tiles)}] [PROC] Processing {name}...")
-            try:
-                H, Tex, VB, W_Data = read_mapm_data(mpath)
-                cx, cy = region_center_world(rx, rz, REGION_ORIENT)
-                obj = create_grid_object(name, cx, cy)
-                for c in list(obj.users_collection): c.objects.unlink(obj)
-                coll.objects.link(obj)
-                apply_heights(obj, H)
-                obj.rotation_euler = (0, 0, zrad)
-                lightmap_image = None
-                if p.import_lightmaps:
-                    tpath = find_res(map_root, a, b, ".t")
-                    if tpath:
-                        dds_data = read_mapt_lightmap(tpath)
-                        if dds_data:
-                           lightmap_image = load_dds_from_data(dds_data, name)
-                    else:
-                        print(f"    [INFO] No .t file found for region {name}.")
-                if p.import_textures and TERRAIN_DDJ:
-                    me = obj.data
-                    tex_flat = [0] * (len(me.vertices))
-                    vbright_flat = [1.0] * (len(me.vertices))
-                    for vid in range(len(me.vertices)):
-                        r = vid // VERTS_PER_AXIS
-                        c = vid % VERTS_PER_AXIS
-                        tex_flat[vid] = Tex[r][c]
-                        if p.import_vertex_brightness:
-                            vbright_flat[vid] = VB[r][c] / 255.0
-                    paint_region(obj, tex_flat, sro_root, lightmap_image, p.import_vertex_brightness, vbright_flat if p.import_vertex_brightness else None)
-                if p.import_water and W_Data:
-                    create_water_object(name, cx, cy, W_Data, zrad, sro_root, coll)
-                created += 1
-                print(f"  [{i:04d}/{len(tiles)}] [SUCCESS] Region {name} created successfully.")
-            except Exception as e:
-                print(f"  [{i:04d}/{len(tiles)}] [FATAL] Failed to process region ({rx},{rz}): {e}")
+            tpath = None
+            if p.import_lightmaps:
+                tpath = find_res(map_root, a, b, ".t")
+                if not tpath:
+                    print(f"    [INFO] No .t file found for region {name}.")
+            jobs.append((i, rx, rz, name, mpath, tpath))
+        # File reading and parsing run in worker threads; every Blender call stays on the main thread,
+        # which consumes the results in tile order. At most 2x workers regions are in flight, so a Full Map
+        # import does not hold every region's arrays and lightmap bytes at once.
+        from concurrent.futures import ThreadPoolExecutor
+        workers = os.cpu_count() or 1
+        todo = iter(jobs)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for job in todo:
+                pending.append((job, executor.submit(load_region_files, job[4], job[5])))
+                if len(pending) >= 2 * workers: break
+            while pending:
+                (i, rx, rz, name, mpath, tpath), future = pending.popleft()
+                nxt = next(todo, None)
+                if nxt: pending.append((nxt, executor.submit(load_region_files, nxt[4], nxt[5])))
+                print(f"  [{i:04d}/{len(tiles)}] [PROC] Processing {name}...")
+                try:
+                    H, Tex, VB, W_Data, dds_data = future.result()
+                    cx, cy = region_center_world(rx, rz, REGION_ORIENT)
+                    obj = create_grid_object(name, cx, cy, template_mesh)
+                    for c in list(obj.users_collection): c.objects.unlink(obj)
+                    coll.objects.link(obj)
+                    apply_heights(obj, H)
+                    obj.rotation_euler = (0, 0, zrad)
+                    lightmap_image = None
+                    if dds_data:
+                        lightmap_image = load_dds_from_data(dds_data, name)
+                    if p.import_textures and TERRAIN_DDJ:
+                        vbright_flat = VB.ravel().astype(np.float32) * (1.0 / 255.0) if p.import_vertex_brightness else None
+                        paint_region(obj, Tex.ravel(), sro_root, lightmap_image, p.import_vertex_brightness, vbright_flat)
+                    if p.import_water and W_Data:
+                        water_obj = create_water_object(name, cx, cy, W_Data, zrad, sro_root, coll)
+                        if water_obj: water_objs.append(water_obj)
+                    terrain_objs.append(obj)
+                    created += 1
+                    print(f"  [{i:04d}/{len(tiles)}] [SUCCESS] Region {name} created successfully.")
+                except Exception as e:
+                    print(f"  [{i:04d}/{len(tiles)}] [FATAL] Failed to process region ({rx},{rz}): {e}")
+        bpy.data.meshes.remove(template_mesh)
+        if p.merge_regions:
+            join_objects(ctx, terrain_objs, f"{coll_name}_Terrain")
+            join_objects(ctx, water_objs, f"{coll_name}_Water")
         dt = time.time() - t0
         report_msg = f"Import finished. Created {created}/{len(tiles)} regions in {dt:.2f}s."
         self.report({'INFO'}, report_msg)
         print(f"[SUCCESS] {report_msg}")
         return {'FINISHED'}
 
+_PARSE_ID = SRO_OT_ParseData.bl_idname
+_IMPORT_ID = SRO_OT_ExecuteImport.bl_idname
+
 class SRO_PT_Project(Panel):
     bl_label = "SRO Project"
     bl_idname = "SRO_PT_Project"
@@ -657,45 +856,54 @@ class SRO_PT_Project(Panel):
         box = layout.box()
         box.label(text="1. Setup & Parse", icon='FILE_FOLDER')
         box.prop(p, "sro_root", text="")
-        box.operator(SRO_OT_ParseData.bl_idname, icon='FILE_REFRESH')
-        if p.is_root_valid and p.is_data_parsed:
+        box.operator(_PARSE_ID, icon='FILE_REFRESH')
+        root_ok = p.is_root_valid; parsed = p.is_data_parsed
+        if root_ok and parsed:
             box = layout.box()
             box.label(text="2. Import Settings", icon='SETTINGS')
             col = box.column(align=True)
-            col.prop(p, "import_mode", expand=True)
+            prop = col.prop
+            prop(p, "import_mode", expand=True)
             if p.import_mode == 'NAMED':
-                col.prop(p, "named_region_choice")
+                prop(p, "named_region_choice")
             col.separator()
-            col.prop(p, "import_textures")
-            sub = col.column(align=True)
-            sub.enabled = p.import_textures
-            row = sub.row(); row.separator(); row.prop(p, "import_lightmaps")
-            row2 = sub.row(); row2.separator(); row2.prop(p, "import_vertex_brightness")
+            prop(p, "import_textures")
+            if p.import_textures:
+                row = col.row(align=True); row.separator()
+                sub = row.column(align=True)
+                sub.prop(p, "import_lightmaps")
+                sub.prop(p, "import_vertex_brightness")
             col.separator()
-            col.prop(p, "import_water")
+            prop(p, "import_water")
+            prop(p, "merge_regions")
             layout.separator()
-            layout.operator(SRO_OT_ExecuteImport.bl_idname, icon='PLAY', text="Import Map")
-        elif p.is_root_valid:
+            layout.operator(_IMPORT_ID, icon='PLAY', text="Import Map")
+        elif root_ok:
              layout.label(text="Root is valid. Please parse data.", icon='ERROR')
 
 CLASSES = (SRO_ProjectProps, SRO_OT_ParseData, SRO_OT_ExecuteImport, SRO_PT_Project)
 
+_CLASSES_REV = CLASSES[::-1]
+_register_classes, _ = bpy.utils.register_classes_factory(CLASSES)
+
 def register():
-    for c in CLASSES:
-        bpy.utils.register_class(c)
-    bpy.types.Scene.sro_props = PointerProperty(type=SRO_ProjectProps)
-    _banner()
+    _register_classes()
+    bpy.types.Scene.sro_props = _SRO_PROPS_PTR
+    os.makedirs(TEMP_DIR, exist_ok=True)
+    ns = bpy.app.driver_namespace
+    if not ns.get(_BANNER_KEY):
+        _banner()
+        ns[_BANNER_KEY] = True
 
 def unregister():
-    if hasattr(bpy.types.Scene, "sro_props"):
+    try:
         del bpy.types.Scene.sro_props
-    for c in reversed(CLASSES):
-        try:
+    except AttributeError:
+        pass
+    for c in _CLASSES_REV:
+        if getattr(c, "is_registered", False):
             bpy.utils.unregister_class(c)
-        except RuntimeError:
-            pass
-    TEXTURE_CACHE.clear(); MATERIAL_CACHE.clear(); LIGHTMAP_CACHE.clear()
-    WATER_MAT_CACHE.clear(); WATER_TEX_CACHE.clear()
+    _reset_caches()
 
 if __name__ == "__main__":
     register()